@@ -0,0 +1,297 @@
+import argparse
+import csv
+import gc
+import json
+import resource
+import sys
+import types
+from multiprocessing import Pool
+from timeit import Timer
+
+import elementary_graph_algorithms
+from elementary_graph_algorithms import Graph, transpose
+from graph_representations import dictlist_from_graph
+from seeded_graph_generation import generate_graph
+
+
+# ********
+#
+# benchmark suite for the traversals in 'elementary_graph_algorithms'
+#  - every algorithm timed on a grid of generators, sizes, and densities
+#  - every measurement in a fresh process, so peak memory is its own
+#
+# ********
+
+#
+# algorithms, with:
+#  - kind:      how it is called: 'pair' (graph, start, end), 'pair_t' (graph, start,
+#               end, graph_t) with the transpose made once and not timed, 'source'
+#               (graph, start), 'roots' (graph, [start]), or 'graph' (graph)
+#  - acyclic:   whether it needs a DAG (edges to lower numbered nodes are dropped)
+#  - max_nodes, max_edges: largest graph it is run on, for the exponential ones
+#
+_ALGORITHMS = [
+    # (name,                                                kind,       acyclic,    max_nodes,  max_edges)
+    ('dfs_ss_any_pythondocs',                               'pair',     False,      20,         100),
+    ('dfs_ss_all_pythondocs',                               'pair',     False,      20,         100),
+    ('dfs_ss_shortest_pythondocs',                          'pair',     False,      20,         100),
+    ('dfs_ss_all_paths',                                    'pair',     False,      20,         100),
+    ('dfs_ss_all_shortest',                                 'pair',     False,      None,       None),
+    ('count_paths_dag',                                     'pair',     True,       None,       None),
+    ('dfs_sm_any_cormen',                                   'source',   False,      None,       None),
+    ('timeddfs_sm_any_cormen',                              'source',   False,      None,       None),
+    ('dfs_sm_any_cormen_extended',                          'roots',    False,      None,       None),
+    ('timeddfs_sm_any_cormen_extended',                     'roots',    False,      None,       None),
+    ('timeddfs_sm_any_cormen_extended_copying',             'roots',    False,      None,       None),
+    ('timeddfs_sm_any_cormen_extended_finished',            'roots',    False,      None,       None),
+    ('timeddfs_sm_any_cormen_extended_finished_copying',    'roots',    False,      None,       None),
+    ('timeddfs_sm_any_cormen_extended_components',          'roots',    False,      None,       None),
+    ('timeddfs_sm_any_cormen_extended_components_copying',  'roots',    False,      None,       None),
+    ('dfs_visit',                                           'roots',    False,      None,       None),
+    ('dfs_iter',                                            'source',   False,      None,       None),
+    ('reachable',                                           'source',   False,      None,       None),
+    ('reachable_copying',                                   'source',   False,      None,       None),
+    ('bfs_ss_shortest_stackoverflow',                       'pair',     True,       20,         50),
+    ('bfs_ss_shortest_stackoverflow_optimised',             'pair',     True,       20,         50),
+    ('bfs_ss_shortest_cormen',                              'pair',     False,      None,       None),
+    ('bfs_ss_shortest_cormen_optimised',                    'pair',     False,      None,       None),
+    ('bfs_ss_shortest_bidirectional',                       'pair_t',   False,      None,       None),
+    ('bfs_sm_shortest_cormen',                              'source',   False,      None,       None),
+    ('bfs_iter',                                            'source',   False,      None,       None),
+    ('strongly_connected_components',                       'graph',    False,      None,       None),
+    ('strongly_connected_components_optimised',             'graph',    False,      None,       None),
+    ('strongly_connected_components_pearce',                'graph',    False,      None,       None),
+    ('topological_sort',                                    'graph',    True,       None,       None),
+    ('topological_sort_kahn',                               'graph',    True,       None,       None),
+    ('topological_levels',                                  'graph',    True,       None,       None),
+]
+
+# generators (as in 'generate_graph'), with the highest density they are run at:
+#  - the skewed ones drop duplicate edges and slow down as graphs fill up
+#  - None for a fixed shape, run once per size whatever the densities: path graphs
+#    are where the path-copying DFS variants are quadratic
+_GENERATORS = {
+    'uniform':          1.0,
+    'rmat':             0.1,
+    'barabasi_albert':  0.1,
+    'path':             None,
+}
+
+SIZES = [ 20, 2000, 20000 ]
+DENSITIES = [ 0.001, 0.01, 0.1, 0.5, 0.95 ]
+
+
+#
+# input:
+#  - generator, no_nodes, density: the graph to build, with about density * n**2 edges
+#
+# output:
+#  - arguments: arguments for 'generate_graph' (Barabasi-Albert takes edges per node)
+#
+def _generator_arguments(generator, no_nodes, density):
+    no_edges = max(1, int(density * no_nodes**2))
+    if generator == 'barabasi_albert': no_edges = max(1, no_edges // no_nodes)
+    if generator == 'path': no_edges = no_nodes - 1
+    return (generator, no_nodes, no_edges)
+
+
+# densities of the grid for 'generator' at 'no_nodes' nodes, limited as above
+def _generator_densities(generator, no_nodes, densities):
+    if _GENERATORS[generator] is None: return [ float(no_nodes - 1) / no_nodes**2 ]
+    return [ density for density in densities if density <= _GENERATORS[generator] ]
+
+
+#
+# runs in a fresh worker process for every measurement
+#
+# input:
+#  - task:   (algorithm, graph arguments, seed, repeat, cache directory)
+#
+# output:
+#  - result: the measurement, as a dict
+#
+# notes:
+#  - the graph is already in the cache, so the worker only maps and converts it
+#  - ru_maxrss is the peak resident size of the process so far (KB on Linux): the
+#    peak after the run is the one of the whole measurement, and the growth over
+#    the peak before it is what the algorithm needed on top of the graph
+#
+def _measure(task):
+    (name, arguments, seed, repeat, cache_dir) = task
+    (_, kind, acyclic, _, _) = [ entry for entry in _ALGORITHMS if entry[0] == name ][0]
+    mapped = generate_graph(*arguments, seed=seed, cache_dir=cache_dir)
+    dictlist = dictlist_from_graph(mapped)
+    mapped.release()
+    if acyclic:
+        for node in dictlist:
+            dictlist[node] = [ adjacent for adjacent in dictlist[node] if adjacent > node ]
+    graph = Graph(dictlist)
+    no_nodes = len(dictlist)
+    no_edges = sum(len(adjacents) for adjacents in dictlist.itervalues())
+    algocode = getattr(elementary_graph_algorithms, name)
+    if kind == 'pair': call = lambda: algocode(graph, 0, no_nodes - 1)
+    elif kind == 'pair_t':
+        graph_t = transpose(graph)
+        call = lambda: algocode(graph, 0, no_nodes - 1, graph_t)
+    elif kind == 'source': call = lambda: algocode(graph, 0)
+    elif kind == 'roots': call = lambda: algocode(graph, [0])
+    else: call = lambda: algocode(graph)
+    def run():
+        result = call()
+        # generators only do their work when consumed (but keep nothing)
+        if isinstance(result, types.GeneratorType):
+            for item in result: pass
+    gc.collect()
+    peak_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    seconds = min(Timer(run).repeat(repeat, 1))
+    peak_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {    'algorithm':        name,
+                'generator':        arguments[0],
+                'nodes':            no_nodes,
+                'edges':            no_edges,
+                'seconds':          seconds,
+                'edges_per_second': no_edges / seconds if seconds > 0 else None,
+                'peak_rss_kb':      peak_after,
+                'extra_rss_kb':     peak_after - peak_before     }
+
+
+#
+# input:
+#  - algorithms: names of the algorithms to run (all if not given)
+#  - generators: names of the generators to build graphs with
+#  - sizes:      numbers of nodes
+#  - densities:  fractions of the n**2 possible edges
+#  - seed:       for the generators, so runs are comparable
+#  - repeat:     runs per measurement (the fastest is kept)
+#  - max_edges:  largest graph to build
+#  - cache_dir:  where generated graphs are kept (see 'generate_graph')
+#  - report:     called with every result as soon as it is ready
+#
+# output:
+#  - results:    list of measurements (as dicts), grid order
+#
+def run_benchmarks(algorithms=None, generators=None, sizes=SIZES, densities=DENSITIES,
+                   seed=1, repeat=3, max_edges=4000000, cache_dir=None, report=None):
+    if algorithms is None: algorithms = [ entry[0] for entry in _ALGORITHMS ]
+    if generators is None: generators = sorted(_GENERATORS)
+    for name in algorithms:
+        if not name in [ entry[0] for entry in _ALGORITHMS ]: raise ValueError("Unknown algorithm '{0}'".format(name))
+    for generator in generators:
+        if not generator in _GENERATORS: raise ValueError("Unknown generator '{0}'".format(generator))
+    results = []
+    # a process per task, for peak memory of its own
+    pool = Pool(1, maxtasksperchild=1)
+    try:
+        for generator in generators:
+            for no_nodes in sizes:
+                for density in _generator_densities(generator, no_nodes, densities):
+                    if density * no_nodes**2 > max_edges: continue
+                    arguments = _generator_arguments(generator, no_nodes, density)
+                    # generate once, here, for all the workers to load
+                    generate_graph(*arguments, seed=seed, cache_dir=cache_dir).release()
+                    for (name, kind, acyclic, max_nodes, max_algo_edges) in _ALGORITHMS:
+                        if not name in algorithms: continue
+                        if max_nodes is not None and no_nodes > max_nodes: continue
+                        if max_algo_edges is not None and density * no_nodes**2 > max_algo_edges: continue
+                        result = pool.apply(_measure, ((name, arguments, seed, repeat, cache_dir),))
+                        result['density'] = density
+                        results.append(result)
+                        if report: report(result)
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+    return results
+
+
+def _key(result):
+    return (result['algorithm'], result['generator'], result['nodes'], result['density'])
+
+
+#
+# input:
+#  - results:   measurements from 'run_benchmarks'
+#  - baseline:  earlier measurements, as saved by 'write_json'
+#  - tolerance: allowed slow-down, as a fraction
+#  - noise:     differences in seconds too small to count
+#
+# output:
+#  - regressions: (result, baseline result) for every measurement slower than its
+#                 baseline by more than 'tolerance'
+#
+def compare_with_baseline(results, baseline, tolerance=0.2, noise=0.001):
+    previous = dict((_key(result), result) for result in baseline)
+    regressions = []
+    for result in results:
+        other = previous.get(_key(result))
+        if other is None: continue
+        if result['seconds'] > other['seconds'] * (1 + tolerance) and result['seconds'] - other['seconds'] > noise:
+            regressions.append((result, other))
+    return regressions
+
+
+_FIELDS = [ 'algorithm', 'generator', 'nodes', 'density', 'edges', 'seconds', 'edges_per_second', 'peak_rss_kb', 'extra_rss_kb' ]
+
+def write_json(results, path):
+    with open(path, 'w') as fileobj:
+        json.dump(results, fileobj, indent=2, sort_keys=True)
+
+def read_json(path):
+    with open(path) as fileobj:
+        return json.load(fileobj)
+
+def write_csv(results, path):
+    with open(path, 'wb') as fileobj:
+        writer = csv.DictWriter(fileobj, _FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def _print_result(result):
+    label = "{0} ({1}, {2} nodes, {3} edges)".format(result['algorithm'], result['generator'], result['nodes'], result['edges'])
+    print "{0:<85} : {1:.6f}s, {2} extra KB".format(label, result['seconds'], result['extra_rss_kb'])
+    sys.stdout.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark graph traversals over a grid of random graphs.")
+    parser.add_argument('--algorithms', nargs='+', metavar='NAME', help="algorithms to run (default: all)")
+    parser.add_argument('--generators', nargs='+', metavar='NAME', help="generators to use (default: all)")
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES, metavar='N')
+    parser.add_argument('--densities', nargs='+', type=float, default=DENSITIES, metavar='P')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-edges', type=int, default=4000000)
+    parser.add_argument('--cache-dir', help="directory for generated graphs")
+    parser.add_argument('--json', metavar='PATH', help="write results as JSON")
+    parser.add_argument('--csv', metavar='PATH', help="write results as CSV")
+    parser.add_argument('--baseline', metavar='PATH', help="JSON results to compare with")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed slow-down over the baseline")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.algorithms, args.generators, args.sizes, args.densities,
+                             args.seed, args.repeat, args.max_edges, args.cache_dir, _print_result)
+    if args.json: write_json(results, args.json)
+    if args.csv: write_csv(results, args.csv)
+    if args.baseline:
+        regressions = compare_with_baseline(results, read_json(args.baseline), args.tolerance)
+        print "\n*** Regressions against {0}: {1} ***\n".format(args.baseline, len(regressions))
+        for (result, other) in regressions:
+            label = "{0} ({1}, {2} nodes, {3} edges)".format(result['algorithm'], result['generator'], result['nodes'], result['edges'])
+            print "{0:<85} : {1:.6f}s, was {2:.6f}s".format(label, result['seconds'], other['seconds'])
+        if regressions: return 1
+    return 0
+
+
+
+
+
+# ********
+#
+# performance tests
+#
+# ********
+
+if __name__ == '__main__':
+
+    sys.exit(main())
@@ -0,0 +1,223 @@
+from graph_representations import BitsetGraph, nodes_from_bits
+from elementary_graph_algorithms import bfs_sm_shortest_cormen, reachable, strongly_connected_components_pearce
+
+
+# ********
+#
+# traversals on the bit-matrix representation
+#  - sets of nodes are Python ints, so a whole row of adjacent nodes is merged
+#    into a frontier, or masked by the visited nodes, in one operation
+#  - for dense graphs: the work per node is n/64 words instead of one Python
+#    step per edge (see 'BITSET_DENSITY' and 'dense_graph')
+#
+# ********
+
+#
+# from Cormen etc.
+#  - bit-parallel variant
+#
+# input:
+#  - graph:    directed, may be cyclic (bit-matrix representation)
+#  - start:    root node to search from
+#
+# output:
+#  - parent:   parent relationship to 'start' for all nodes in graph
+#  - distance: shortest distance to 'start' for all nodes in graph
+#
+# notes:
+#  - performs a breath-first search, one level at a time
+#  - the nodes a rim node discovers are its row AND the nodes not yet seen, found
+#    with one operation instead of a look-up per edge
+#  - 'distance' is the same as for 'bfs_sm_shortest_cormen', but 'parent' may differ
+#    since nodes newly discovered together are taken in increasing order
+#
+def bfs_sm_shortest_bitset(graph, start):
+    rows = graph.rows()
+    parent = { start: None }
+    distance = { start: 0 }
+    unseen = ((1 << len(rows)) - 1) & ~(1 << start)
+    rim = [start]
+    level = 0
+    while rim and unseen:
+        level += 1
+        next_rim = []
+        for node in rim:
+            discovered = rows[node] & unseen
+            if not discovered: continue
+            unseen ^= discovered
+            for adjacent in nodes_from_bits(discovered):
+                parent[adjacent] = node
+                distance[adjacent] = level
+                next_rim.append(adjacent)
+        rim = next_rim
+    return parent, distance
+
+
+#
+# input:
+#  - rows:    rows of the graph
+#  - root:    node to search from
+#  - within:  nodes the search may visit (as int), including 'root'
+#
+# output:
+#  - reached: nodes reachable from 'root' through 'within' (as int)
+#
+# notes:
+#  - the next frontier is the OR of the rows of the current one, AND NOT what has
+#    been reached already
+#
+def _reach(rows, root, within):
+    reached = frontier = 1 << root
+    while frontier:
+        adjacent = 0
+        for node in nodes_from_bits(frontier):
+            adjacent |= rows[node]
+        frontier = adjacent & within & ~reached
+        reached |= frontier
+    return reached
+
+
+#
+# as 'reachable', but for the bit-matrix representation
+#
+def reachable_bitset(graph, root):
+    return set(nodes_from_bits(_reach(graph.rows(), root, (1 << graph.no_nodes()) - 1)))
+
+
+#
+# as '_reach', but backwards: nodes in 'within' that reach 'root'
+#
+# notes:
+#  - without the transpose: a node reaches 'root' if its row meets the nodes found
+#    so far, so the candidates are checked in passes until one finds nothing new
+#  - nodes found are used straight away in the same pass, so there are at most as
+#    many passes as the longest path needed, and only a few on dense graphs
+#
+def _reach_backward(rows, root, within):
+    reached = 1 << root
+    candidates = within & ~reached
+    found = True
+    while found:
+        found = False
+        for node in nodes_from_bits(candidates):
+            if rows[node] & reached:
+                reached |= 1 << node
+                found = True
+        candidates &= ~reached
+    return reached
+
+
+#
+# from Fleischer, Hendrickson, and Pinar, "On identifying strongly connected
+# components in parallel"
+#
+# input:
+#  - graph:      directed, may be cyclic (bit-matrix representation)
+#
+# output:
+#  - components: the strongly connected components in the graph (as list of sets),
+#                in no particular order
+#
+# notes:
+#  - forward-backward: the nodes both reachable from a pivot and reaching it are
+#    its component; every other component lies entirely in the forward set, the
+#    backward set, or neither, so each of those three is split up on its own
+#  - searches never leave the set being split
+#  - nodes without edges in or out within the set are components by themselves,
+#    and are trimmed off first, saving two searches each
+#
+def strongly_connected_components_bitset(graph):
+    rows = graph.rows()
+    components = []
+    pending = [ (1 << len(rows)) - 1 ]
+    while pending:
+        within = _trim(rows, pending.pop(), components)
+        if not within: continue
+        # lowest node left
+        pivot = (within & -within).bit_length() - 1
+        forward = _reach(rows, pivot, within)
+        backward = _reach_backward(rows, pivot, within)
+        component = forward & backward
+        components.append(set(nodes_from_bits(component)))
+        for rest in [ forward & ~component, backward & ~component, within & ~(forward | backward) ]:
+            if rest: pending.append(rest)
+    return components
+
+
+# removes nodes with no edges in or out within 'within', as components of their own
+def _trim(rows, within, components):
+    trimmed = True
+    while trimmed and within:
+        trimmed = False
+        nodes = nodes_from_bits(within)
+        # nodes with an edge in from 'within'
+        entered = 0
+        for node in nodes:
+            entered |= rows[node]
+        for node in nodes:
+            if rows[node] & within and (entered >> node) & 1: continue
+            within &= ~(1 << node)
+            components.append(set([node]))
+            trimmed = True
+    return within
+
+
+#
+# the above for graphs in bit-matrix representation, and the list-based ones for
+# the others; use 'dense_graph' to pick the representation
+#
+def bfs_sm_shortest_auto(graph, start):
+    if isinstance(graph, BitsetGraph): return bfs_sm_shortest_bitset(graph, start)
+    return bfs_sm_shortest_cormen(graph, start)
+
+def reachable_auto(graph, root):
+    if isinstance(graph, BitsetGraph): return reachable_bitset(graph, root)
+    return reachable(graph, root)
+
+def strongly_connected_components_auto(graph):
+    if isinstance(graph, BitsetGraph): return strongly_connected_components_bitset(graph)
+    return strongly_connected_components_pearce(graph)
+
+
+
+
+
+# ********
+#
+# performance tests
+#
+# ********
+
+if __name__ == '__main__':
+
+    from random_graph_generation import random_dictlist_graph_sample_split_set_optimised as random_dictlist_graph
+    from graph_representations import bitsetgraph_from_graph, dictlist_size_in_bytes, BITSET_DENSITY
+    from elementary_graph_algorithms import Graph
+
+    from timeit import Timer
+    import gc
+
+    print "\n*** Tests for 'Graph' vs 'BitsetGraph', dense above {0} of all edges: ***\n".format(BITSET_DENSITY)
+
+    tests = [   (2000,4000), (2000,40000), (2000,125000), (2000,400000), (2000,1000000), (2000,3000000), (10000,5000000)   ]
+
+    for test in tests:
+        print test
+        dictlist = random_dictlist_graph(*test)
+        dictgraph = Graph(dictlist)
+        bitsetgraph = bitsetgraph_from_graph(dictgraph)
+        time = Timer(lambda: bitsetgraph_from_graph(dictgraph)).timeit(number=1)
+        print "{0:<55} : {1}".format("bitsetgraph_from_graph", time)
+        print "{0:<55} : {1}".format("bytes, Graph", dictlist_size_in_bytes(dictlist))
+        print "{0:<55} : {1}".format("bytes, BitsetGraph", bitsetgraph.size_in_bytes())
+        pairs = [   ("bfs_sm_shortest_cormen", lambda: bfs_sm_shortest_cormen(dictgraph, 0)),
+                    ("bfs_sm_shortest_bitset", lambda: bfs_sm_shortest_bitset(bitsetgraph, 0)),
+                    ("reachable", lambda: reachable(dictgraph, 0)),
+                    ("reachable_bitset", lambda: reachable_bitset(bitsetgraph, 0)),
+                    ("strongly_connected_components_pearce", lambda: strongly_connected_components_pearce(dictgraph)),
+                    ("strongly_connected_components_bitset", lambda: strongly_connected_components_bitset(bitsetgraph))    ]
+        for (name, call) in pairs:
+            time = Timer(call).timeit(number=3)
+            print "{0:<55} : {1}".format(name, time)
+            gc.collect()
+        print ""
@@ -0,0 +1,499 @@
+import sys
+from array import array
+from timeit import default_timer as timer
+
+from elementary_graph_algorithms import Graph, strongly_connected_components_pearce
+
+
+# ********
+#
+# reachability index
+#  - built once from the strongly connected components, then answers
+#    reachability queries by look-up instead of traversal
+#
+# ********
+
+#
+# input:
+#  - graph: directed, may be cyclic (dict+list representation)
+#
+# notes:
+#  - all nodes in a component reach the same nodes, so it is enough to know which
+#    components reach which: the condensation DAG has a node per component and an
+#    edge C -> C' if some edge in graph goes from C to C'
+#  - components come out of 'strongly_connected_components_pearce' in topological
+#    order, so component i only reaches components j >= i; the reachable set of i is
+#    a bitset (a Python int) with bit j-i set, computed from i = C-1 down to 0 as
+#    the union of the bitsets of its successors in the DAG
+#  - building is O(V+E) for the components plus O(C * E_dag / 64) for the bitsets;
+#    the bitsets take at most C**2 / 16 bytes
+#  - 'reaches' is O(1) (on C / 64 words); 'reachable' is linear in its output
+#
+class ReachabilityIndex:
+
+    def __init__(self, graph):
+        started = timer()
+        components = strongly_connected_components_pearce(graph)
+        component = dict()
+        for (i, members) in enumerate(components):
+            for node in members:
+                component[node] = i
+        # condensation DAG
+        dag = [ set() for members in components ]
+        for node in graph.nodes():
+            i = component[node]
+            for adjacent in graph.neighbours(node):
+                j = component[adjacent]
+                if i != j: dag[i].add(j)
+        # reachable components, relative to the component itself
+        reach = [0] * len(components)
+        for i in xrange(len(components) - 1, -1, -1):
+            bits = 1
+            for j in dag[i]:
+                bits |= reach[j] << (j - i)
+            reach[i] = bits
+        self._components = components
+        self._component = component
+        self._dag = [ sorted(successors) for successors in dag ]
+        self._reach = reach
+        self._build_time = timer() - started
+
+    # whether there is a path from 'node' to 'other'
+    def reaches(self, node, other):
+        if node == other: return True
+        if not node in self._component or not other in self._component: return False
+        i = self._component[node]
+        j = self._component[other]
+        return j >= i and (self._reach[i] >> (j - i)) & 1 == 1
+
+    # all nodes reachable from 'node' (as set), like 'reachable(graph, node)'
+    def reachable(self, node):
+        if not node in self._component: return set([node])
+        i = self._component[node]
+        reached = set()
+        # walk the bits from the least significant end
+        bits = bin(self._reach[i])[:1:-1]
+        offset = bits.find('1')
+        while offset >= 0:
+            reached.update(self._components[i + offset])
+            offset = bits.find('1', offset + 1)
+        return reached
+
+    def component_id(self, node):
+        return self._component[node]
+
+    def component(self, node):
+        return self._components[self._component[node]]
+
+    def components(self):
+        return self._components
+
+    # condensation DAG, with components as nodes 0..C-1 in topological order
+    def condensation(self):
+        return Graph(dict(enumerate(self._dag)))
+
+    def build_time(self):
+        return self._build_time
+
+    def size_in_bytes(self):
+        size = sys.getsizeof(self._components) + sys.getsizeof(self._component)
+        size += sum(sys.getsizeof(members) for members in self._components)
+        size += sys.getsizeof(self._dag) + sum(sys.getsizeof(successors) for successors in self._dag)
+        size += sys.getsizeof(self._reach) + sum(sys.getsizeof(bits) for bits in self._reach)
+        return size
+
+
+
+
+# ********
+#
+# incremental strongly connected components
+#  - kept up to date as edges are added, instead of recomputed
+#
+# ********
+
+#
+# from Pearce and Kelly, "A dynamic topological sort algorithm for directed acyclic graphs"
+#  - extended to merge components when an edge closes a cycle
+#
+# input:
+#  - graph: directed, may be cyclic (dict+list representation), to start from
+#
+# notes:
+#  - keeps the condensation DAG (edges between component ids, both directions) and
+#    a topological 'order' of its components
+#  - adding u -> v within a component, or in the direction of 'order', changes nothing
+#    but the DAG: O(1)
+#  - otherwise only the components between cv and cu in 'order' are affected: those
+#    reachable from cv ('forward') and those reaching cu ('backward'), each searched
+#    without leaving the affected region
+#  - if cu is in 'forward' the edge closes a cycle, and the components in both
+#    'forward' and 'backward' are exactly the ones on it: they are merged into one
+#  - the affected components then share out their old 'order' values, with 'backward'
+#    taking the lowest, 'forward' the highest, and the merged component (if any) one
+#    in between
+#  - merging moves the members of the smaller components into the largest one
+#
+class IncrementalSCC:
+
+    def __init__(self, graph=None):
+        self._component = dict()    # node -> component id
+        self._members = dict()      # component id -> nodes
+        self._out = dict()          # component id -> successor component ids
+        self._in = dict()           # component id -> predecessor component ids
+        self._order = dict()        # component id -> topological position
+        self._next_id = 0
+        if graph is None: return
+        # components come in topological order, so their index is a valid position
+        for members in strongly_connected_components_pearce(graph):
+            self._new_component(members)
+        for node in graph.nodes():
+            for adjacent in graph.neighbours(node):
+                self._add_dag_edge(self._component[node], self._component[adjacent])
+
+    def _new_component(self, members):
+        cid = self._next_id
+        self._next_id += 1
+        for node in members:
+            self._component[node] = cid
+        self._members[cid] = set(members)
+        self._out[cid] = set()
+        self._in[cid] = set()
+        self._order[cid] = cid
+        return cid
+
+    def _add_dag_edge(self, cu, cv):
+        if cu == cv: return
+        self._out[cu].add(cv)
+        self._in[cv].add(cu)
+
+    def add_node(self, node):
+        if not node in self._component: self._new_component([node])
+
+    #
+    # input:
+    #  - node, adjacent: edge to add (nodes are added if new)
+    #
+    # output:
+    #  - merged:         whether components were merged
+    #
+    def add_edge(self, node, adjacent):
+        self.add_node(node)
+        self.add_node(adjacent)
+        cu = self._component[node]
+        cv = self._component[adjacent]
+        if cu == cv or cv in self._out[cu]: return False
+        order = self._order
+        lower = order[cv]
+        upper = order[cu]
+        if upper < lower:
+            # consistent with current order
+            self._add_dag_edge(cu, cv)
+            return False
+        forward = self._search(cv, self._out, lambda cid: order[cid] <= upper)
+        backward = self._search(cu, self._in, lambda cid: order[cid] >= lower)
+        cycle = forward & backward if cu in forward else set()
+        # re-use the positions of the affected region: the lowest ones for backward,
+        # the highest ones for forward, and the one in between for a merged component
+        positions = sorted(order[cid] for cid in forward | backward)
+        bykey = lambda cid: order[cid]
+        lowest = sorted(backward - cycle, key=bykey)
+        highest = sorted(forward - cycle, key=bykey)
+        if cycle: lowest.append(cu)
+        for (cid, position) in zip(lowest, positions):
+            order[cid] = position
+        for (cid, position) in zip(highest, positions[len(positions) - len(highest):]):
+            order[cid] = position
+        if cycle:
+            # 'cu' holds the position of the merged component
+            position = order[cu]
+            order[self._merge(cycle)] = position
+            return True
+        self._add_dag_edge(cu, cv)
+        return False
+
+    # components reachable from 'cid' along 'edges', visiting only those accepted
+    def _search(self, cid, edges, accept):
+        found = set([cid])
+        stack = [cid]
+        while stack:
+            for other in edges[stack.pop()]:
+                if other in found or not accept(other): continue
+                found.add(other)
+                stack.append(other)
+        return found
+
+    # merges 'cids' into the largest of them, returning its id
+    def _merge(self, cids):
+        target = max(cids, key=lambda cid: len(self._members[cid]))
+        for cid in cids:
+            if cid == target: continue
+            for node in self._members.pop(cid):
+                self._component[node] = target
+                self._members[target].add(node)
+            for other in self._out.pop(cid):
+                self._in[other].discard(cid)
+                self._add_dag_edge(target, other)
+            for other in self._in.pop(cid):
+                self._out[other].discard(cid)
+                self._add_dag_edge(other, target)
+            del self._order[cid]
+        # drop edges that are now internal
+        self._out[target] -= cids
+        self._in[target] -= cids
+        return target
+
+    def component_id(self, node):
+        return self._component[node]
+
+    def component(self, node):
+        return self._members[self._component[node]]
+
+    def same_component(self, node, other):
+        return self._component[node] == self._component[other]
+
+    # components (as list of sets) in topological order
+    def components(self):
+        cids = sorted(self._members.iterkeys(), key=lambda cid: self._order[cid])
+        return [ self._members[cid] for cid in cids ]
+
+
+
+
+
+
+# ********
+#
+# disjoint sets
+#  - (weakly) connected components kept up to date as edges stream in, ignoring
+#    their direction
+#
+# ********
+
+#
+# from Tarjan, "Efficiency of a good but not linear set union algorithm"
+#  - see also Cormen etc., chapter 21
+#
+# input:
+#  - nodes: nodes to start from, each a set of its own (optional)
+#
+# notes:
+#  - a forest of parent pointers, one tree per set, with the root as representative
+#  - nodes are numbered as they are added, and the forest is kept in flat arrays
+#    indexed by number: 'parent' (array of ints) and 'rank' (bytearray, an upper
+#    bound on the height of the tree, so at most lg V)
+#  - union by rank hangs the lower tree under the higher one; path compression
+#    points every node on the way to a root straight at it
+#  - together O(alpha(V)) amortised per operation, for alpha the inverse Ackermann
+#    function (at most 4 in practice)
+#
+class DisjointSet:
+
+    def __init__(self, nodes=[]):
+        self._index = dict()        # node -> number
+        self._nodes = []            # number -> node
+        self._parent = array('l')
+        self._rank = bytearray()
+        self._no_sets = 0
+        for node in nodes:
+            self.add_node(node)
+
+    # number of 'node', added as a set of its own if new
+    def add_node(self, node):
+        i = self._index.get(node)
+        if i is None:
+            i = len(self._nodes)
+            self._index[node] = i
+            self._nodes.append(node)
+            self._parent.append(i)
+            self._rank.append(0)
+            self._no_sets += 1
+        return i
+
+    def _find(self, i):
+        parent = self._parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        # compress the path
+        while parent[i] != root:
+            (parent[i], i) = (root, parent[i])
+        return root
+
+    # representative of the set of 'node' (the same for all nodes in it)
+    def find(self, node):
+        return self._nodes[self._find(self._index[node])]
+
+    #
+    # input:
+    #  - node, other: edge to add, in either direction (nodes are added if new)
+    #
+    # output:
+    #  - merged:      whether two sets were merged
+    #
+    def union(self, node, other):
+        i = self._find(self.add_node(node))
+        j = self._find(self.add_node(other))
+        if i == j: return False
+        rank = self._rank
+        if rank[i] < rank[j]: (i, j) = (j, i)
+        self._parent[j] = i
+        if rank[i] == rank[j]: rank[i] += 1
+        self._no_sets -= 1
+        return True
+
+    # adds a stream of (node, other) pairs, returning the number of merges
+    def union_all(self, edges):
+        merges = 0
+        for (node, other) in edges:
+            if self.union(node, other): merges += 1
+        return merges
+
+    # whether 'node' and 'other' are in the same set
+    def connected(self, node, other):
+        if node == other: return True
+        if not node in self._index or not other in self._index: return False
+        return self._find(self._index[node]) == self._find(self._index[other])
+
+    def no_sets(self):
+        return self._no_sets
+
+    def size_in_bytes(self):
+        size = sys.getsizeof(self._index) + sys.getsizeof(self._nodes)
+        size += self._parent.buffer_info()[1] * self._parent.itemsize + sys.getsizeof(self._rank)
+        return size
+
+    # sets (as list of sets), in the order of their first node added
+    def sets(self):
+        members = dict()
+        sets = []
+        for (i, node) in enumerate(self._nodes):
+            root = self._find(i)
+            if not root in members:
+                members[root] = set()
+                sets.append(members[root])
+            members[root].add(node)
+        return sets
+
+
+#
+# input:
+#  - graph:      directed, may be cyclic (dict+list representation)
+#
+# output:
+#  - components: the weakly connected components in the graph (as list of sets)
+#
+# notes:
+#  - components ignoring the direction of edges, without building the undirected
+#    graph a DFS would need
+#
+def weakly_connected_components(graph):
+    sets = DisjointSet(graph.nodes())
+    for node in graph.nodes():
+        for adjacent in graph.neighbours(node):
+            sets.union(node, adjacent)
+    return sets.sets()
+
+
+
+# ********
+#
+# performance tests
+#
+# ********
+
+if __name__ == '__main__':
+
+    from random_graph_generation import random_dictlist_graph_sample_split_set_optimised as random_dictlist_graph
+    from elementary_graph_algorithms import reachable, strongly_connected_components_optimised
+
+    from timeit import Timer
+    import random
+    import gc
+
+    print "\n*** Tests for 'ReachabilityIndex' vs 'reachable': ***\n"
+
+    tests = [   (2000,2000), (10000,12000), (2000,30000), (2000,1000000)    ]
+    no_queries = 100
+
+    for test in tests:
+        print test
+        graph = Graph(random_dictlist_graph(*test))
+        index = ReachabilityIndex(graph)
+        print "{0:<55} : {1}".format("components", len(index.components()))
+        print "{0:<55} : {1}".format("build time", index.build_time())
+        print "{0:<55} : {1}".format("size in bytes", index.size_in_bytes())
+        roots = [ random.randrange(test[0]) for query in xrange(no_queries) ]
+        time = Timer(lambda: [ reachable(graph, root) for root in roots ]).timeit(number=1)
+        print "{0:<55} : {1}".format("reachable, {0} queries".format(no_queries), time)
+        gc.collect()
+        time = Timer(lambda: [ index.reachable(root) for root in roots ]).timeit(number=1)
+        print "{0:<55} : {1}".format("ReachabilityIndex.reachable, {0} queries".format(no_queries), time)
+        gc.collect()
+        others = [ random.randrange(test[0]) for query in xrange(no_queries) ]
+        time = Timer(lambda: [ index.reaches(root, other) for (root, other) in zip(roots, others) ]).timeit(number=1)
+        print "{0:<55} : {1}".format("ReachabilityIndex.reaches, {0} queries".format(no_queries), time)
+        gc.collect()
+        print ""
+
+
+
+    print "\n*** Tests for 'IncrementalSCC' vs recomputing: ***\n"
+
+    tests = [   (2000,1000), (2000,2000), (10000,10000), (10000,12000)    ]
+    no_insertions = 1000
+
+    for test in tests:
+        print test
+        dictlist = random_dictlist_graph(*test)
+        graph = Graph(dictlist)
+        incremental = IncrementalSCC(graph)
+        edges = [ (random.randrange(test[0]), random.randrange(test[0])) for insertion in xrange(no_insertions) ]
+        time = Timer(lambda: [ incremental.add_edge(*edge) for edge in edges ]).timeit(number=1)
+        print "{0:<55} : {1}".format("IncrementalSCC.add_edge, per insertion", time / no_insertions)
+        gc.collect()
+        for (node, adjacent) in edges:
+            dictlist[node].append(adjacent)
+        time = Timer(lambda: strongly_connected_components_optimised(graph)).timeit(number=1)
+        print "{0:<55} : {1}".format("strongly_connected_components_optimised, per insertion", time)
+        gc.collect()
+        components = sorted(sorted(component) for component in incremental.components())
+        print "{0:<55} : {1}".format("results match", components == sorted(sorted(component) for component in strongly_connected_components_optimised(graph)))
+        print ""
+
+
+
+    print "\n*** Tests for 'DisjointSet' vs DFS per batch, weakly connected components: ***\n"
+
+    from elementary_graph_algorithms import timeddfs_sm_any_cormen_extended_components
+
+    tests = [   (10000,5000), (10000,20000), (100000,200000)   ]
+    no_batches = 10
+
+    for test in tests:
+        print test
+        (no_nodes, no_edges) = test
+        edges = [ (random.randrange(no_nodes), random.randrange(no_nodes)) for edge in xrange(no_edges) ]
+        batches = [ edges[i::no_batches] for i in xrange(no_batches) ]
+        sets = DisjointSet(xrange(no_nodes))
+        time = Timer(lambda: [ sets.union_all(batch) for batch in batches ]).timeit(number=1)
+        print "{0:<55} : {1}".format("DisjointSet.union_all, per batch", time / no_batches)
+        gc.collect()
+        # the DFS needs the undirected graph, rebuilt with every batch
+        undirected = dict( (node, []) for node in xrange(no_nodes) )
+        def add_batch_and_search(batch):
+            for (node, adjacent) in batch:
+                undirected[node].append(adjacent)
+                undirected[adjacent].append(node)
+            return timeddfs_sm_any_cormen_extended_components(Graph(undirected))
+        time = Timer(lambda: [ add_batch_and_search(batch) for batch in batches ]).timeit(number=1)
+        print "{0:<55} : {1}".format("timeddfs_sm_any_cormen_extended_components, per batch", time / no_batches)
+        gc.collect()
+        queries = [ (random.randrange(no_nodes), random.randrange(no_nodes)) for query in xrange(100000) ]
+        time = Timer(lambda: [ sets.connected(*query) for query in queries ]).timeit(number=1)
+        print "{0:<55} : {1}".format("DisjointSet.connected, per query", time / len(queries))
+        gc.collect()
+        print "{0:<55} : {1}".format("size in bytes", sets.size_in_bytes())
+        components = sorted(sorted(component) for component in sets.sets())
+        print "{0:<55} : {1}".format("results match", components == sorted(sorted(component) for component in weakly_connected_components(Graph(undirected))) == sorted(sorted(component) for component in timeddfs_sm_any_cormen_extended_components(Graph(undirected))))
+        print ""
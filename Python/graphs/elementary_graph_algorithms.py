@@ -15,6 +15,24 @@ class Graph:
         return self._graph.get(node, [])
 
 
+#
+# as 'Graph', but with a weight on every edge
+#  - graph: node -> list of (adjacent node, weight) pairs
+#  - 'neighbours' still gives the adjacent nodes only, so all of the algorithms
+#    below run on it unchanged; 'weighted_neighbours' gives the pairs
+#  - the adjacent nodes are kept apart from the pairs so that 'neighbours' is as
+#    cheap as for 'Graph', at the cost of a second list per node
+#
+class WeightedGraph(Graph):
+
+    def __init__(self, graph=dict()):
+        Graph.__init__(self, dict( (node, [ adjacent for (adjacent, weight) in pairs ]) for (node, pairs) in graph.iteritems() ))
+        self._weighted = graph
+
+    def weighted_neighbours(self, node):
+        return self._weighted.get(node, [])
+
+
 
 #
 # simple test graph: cyclic, unconnected
@@ -132,6 +150,104 @@ def dfs_ss_shortest_pythondocs(graph, start, end, path=[]):
     return shortest
 
 
+#
+# streaming version of the above
+#
+# input:
+#  - graph:      directed, may be cyclic (dict+list representation)
+#  - start:      root node to search from
+#  - end:        target node to search for
+#  - max_length: longest path to follow, in edges (no limit if not given)
+#  - max_count:  number of paths after which to stop (no limit if not given, none
+#                at all if 0)
+#  - graph_t:    transpose(graph), if already computed
+#
+# output:
+#  - paths:      all acyclic paths (as lists), yielded lazily
+#
+# notes:
+#  - performs a depth-first search on a single 'path' stack, extended and shrunk
+#    in place; only the paths yielded are copied
+#  - one breath-first search back from 'end' (in 'graph_t') first gives the distance
+#    to 'end' of every node that can reach it: other nodes are never entered, and
+#    neither are nodes too far from 'end' to make it within 'max_length'
+#  - on a cycle a node may still lead nowhere because of the nodes already on the
+#    path, so the number of paths remains a lower bound on the work
+#
+def dfs_ss_all_paths(graph, start, end, max_length=None, max_count=None, graph_t=None):
+    if graph_t is None: graph_t = transpose(graph)
+    _, distance = bfs_sm_shortest_cormen(graph_t, end)
+    return _paths_to(graph, start, end, distance, max_length, max_count)
+
+
+#
+# as above, but only the shortest paths
+#  - which are exactly the paths no longer than the distance from 'start' to 'end'
+#
+def dfs_ss_all_shortest(graph, start, end, graph_t=None):
+    if graph_t is None: graph_t = transpose(graph)
+    _, distance = bfs_sm_shortest_cormen(graph_t, end)
+    return _paths_to(graph, start, end, distance, distance.get(start), None)
+
+
+def _paths_to(graph, start, end, distance, max_length, max_count):
+    if not start in distance: return
+    if max_length is not None and distance[start] > max_length: return
+    if max_count is not None and max_count <= 0: return
+    if start == end:
+        yield [start]
+        return
+    count = 0
+    path = [start]
+    onpath = set(path)
+    cursors = [iter(graph.neighbours(start))]
+    while cursors:
+        # continue with the deepest node where it left off
+        for adjacent in cursors[-1]:
+            # skip if on the path already, or if it cannot reach 'end' (in time)
+            if adjacent in onpath or not adjacent in distance: continue
+            if max_length is not None and len(path) + distance[adjacent] > max_length: continue
+            if adjacent == end:
+                yield path + [end]
+                count += 1
+                if max_count is not None and count >= max_count: return
+                continue
+            # ... make it the new pivot
+            path.append(adjacent)
+            onpath.add(adjacent)
+            cursors.append(iter(graph.neighbours(adjacent)))
+            break
+        else:
+            # all adjacent nodes done, so backtrack
+            cursors.pop()
+            onpath.remove(path.pop())
+
+
+#
+# input:
+#  - graph: directed, acyclic (dict+list representation)
+#  - start: root node to count from
+#  - end:   target node to count to
+#
+# output:
+#  - count: number of paths from 'start' to 'end'
+#
+# notes:
+#  - the number of paths from a node is the sum over its adjacent nodes, so going
+#    through the nodes in reverse topological order counts them all in O(V+E),
+#    without enumerating any
+#  - raises ValueError if graph has a cycle (see 'topological_sort_kahn')
+#
+def count_paths_dag(graph, start, end):
+    count = dict()
+    for node in reversed(topological_sort_kahn(graph)):
+        if node == end:
+            count[node] = 1
+        else:
+            count[node] = sum(count[adjacent] for adjacent in graph.neighbours(node))
+    return count.get(start, 0)
+
+
 
 
 
@@ -316,6 +432,71 @@ def timeddfs_sm_any_cormen(graph, start):
     return parent, discovered, finished
 
 
+from itertools import count    # for time stamps
+from instrumentation import phase   # for timing phases when given 'stats'
+
+
+#
+# inspired by Cormen etc.
+#  - DFS-VISIT as a reusable engine, with hooks instead of hard-coded bookkeeping
+#
+# input:
+#  - graph:     directed, may be cyclic (dict+list representation)
+#  - rootNodes: nodes to start searches from, in order (all nodes if not given)
+#  - discover:  called as discover(node) when 'node' is first reached
+#  - finish:    called as finish(node) when all nodes adjacent to 'node' are done
+#  - treeedge:  called as treeedge(node, adjacent) when 'adjacent' is reached from 'node'
+#  - root:      called as root(node) when a new tree is started from 'node'
+#  - stats:     'TraversalStats' to count discovered nodes, examined edges, and
+#               stack size into (optional)
+#
+# output:
+#  - greyed:    all nodes reached (as set)
+#
+# notes:
+#  - performs a depth-first search, visiting nodes in the same order as the
+#    functions above
+#  - modified to avoid (non-tail-) recursive calls
+#  - the stack holds each node together with an iterator over its adjacent nodes
+#    (a cursor), so a node resumes where it left off instead of re-scanning, and
+#    the stack is grown and shrunk in place instead of being copied: O(V+E)
+#
+def dfs_visit(graph, rootNodes=None, discover=None, finish=None, treeedge=None, root=None, stats=None):
+    greyed = set()
+    if not rootNodes: rootNodes = graph.nodes()
+    for node in rootNodes:
+        # skip if already discovered (grey)
+        if node in greyed: continue
+        # if new then mark it as discovered
+        greyed.add(node)
+        if root: root(node)
+        if discover: discover(node)
+        # ... and start depth-first search
+        neighbours = graph.neighbours(node)
+        if stats is not None: stats.discover(len(neighbours), 1)
+        stack = [(node, iter(neighbours))]
+        while stack:
+            # continue with the deepest node where it left off
+            node, adjacents = stack[-1]
+            for adjacent in adjacents:
+                # skip if already discovered (grey)
+                if adjacent in greyed: continue
+                # if new then mark it as discovered
+                greyed.add(adjacent)
+                if treeedge: treeedge(node, adjacent)
+                if discover: discover(adjacent)
+                # ... make it the new pivot
+                neighbours = graph.neighbours(adjacent)
+                stack.append((adjacent, iter(neighbours)))
+                if stats is not None: stats.discover(len(neighbours), len(stack))
+                break
+            else:
+                # all adjacent nodes done, so 'node' is finished
+                stack.pop()
+                if finish: finish(node)
+    return greyed
+
+
 #
 # from Cormen etc.
 #
@@ -328,12 +509,35 @@ def timeddfs_sm_any_cormen(graph, start):
 #  - finished:   time slots for when each node was fully processed (dictionary)
 #
 # notes:
-#  - performs a depth-first search
-#  - modified to avoid (non-tail-) recursive calls
+#  - performs a depth-first search using 'dfs_visit'
+#
+def timeddfs_sm_any_cormen_extended(graph, rootNodes=None, stats=None):
+    parent = dict()
+    discovered = dict()
+    finished = dict()
+    time = count()
+    def root(node):
+        parent[node] = None
+    def treeedge(node, adjacent):
+        parent[adjacent] = node
+    def discover(node):
+        discovered[node] = next(time)
+    def finish(node):
+        finished[node] = next(time)
+    dfs_visit(graph, rootNodes, discover, finish, treeedge, root, stats)
+    return parent, discovered, finished
+
+
+#
+# path-copying version of the above, kept for comparison
+#
+# notes:
 #  - 'discovered' makes 'greyed' redundant
 #  - experiment by using 'for-else' construct instead of 'isfinished' boolean
+#  - 'path + [node, adjacent]' copies the stack on every discovery, which is
+#    quadratic on deep graphs
 #
-def timeddfs_sm_any_cormen_extended(graph, rootNodes=None):
+def timeddfs_sm_any_cormen_extended_copying(graph, rootNodes=None):
     parent = dict()
     discovered = dict()
     finished = dict()
@@ -503,8 +707,10 @@ def bfs_ss_shortest_cormen(graph, start, end):
 
 #
 # optimised version of the above
+#  - 'stats' (optional) counts the search as in 'dfs_visit', with the rim as frontier,
+#    and times it apart from building the path
 #
-def bfs_ss_shortest_cormen_optimised(graph, start, end):
+def bfs_ss_shortest_cormen_optimised(graph, start, end, stats=None):
     # optimisation: no need to start the bigger machinery if already there
     if start == end:
         return [start]
@@ -512,19 +718,91 @@ def bfs_ss_shortest_cormen_optimised(graph, start, end):
     parent = { start: None }
     # optimisation: use a double linked list to store rim -- good for FIFO
     rim = deque([start])
-    while rim:
-        # optimisation: this is now fast (O(1))
-        node = rim.popleft()
-        for adjacent in graph.neighbours(node):
-            if adjacent in greyed: continue
-            elif adjacent == end:
-                # we have found the target, traverse parent map to get path
-                parent[adjacent] = node
-                return path_from_root(parent, adjacent)
+    with phase(stats, 'search'):
+        while rim:
+            # optimisation: this is now fast (O(1))
+            node = rim.popleft()
+            neighbours = graph.neighbours(node)
+            if stats is not None: stats.discover(len(neighbours), len(rim) + 1)
+            for adjacent in neighbours:
+                if adjacent in greyed: continue
+                elif adjacent == end:
+                    # we have found the target
+                    parent[adjacent] = node
+                    break
+                else:
+                    parent[adjacent] = node
+                    greyed.add(adjacent)
+                    rim.append(adjacent)
             else:
-                parent[adjacent] = node
-                greyed.add(adjacent)
-                rim.append(adjacent)
+                continue
+            # target found, so leave the while loop too
+            break
+    if not end in parent: return None
+    with phase(stats, 'path'):
+        # traverse parent map to get path
+        return path_from_root(parent, end)
+
+
+#
+# bidirectional version of the above
+#
+# input:
+#  - graph:   directed, may be cyclic (dict+list representation)
+#  - start:   root node to search from
+#  - end:     target node to search for
+#  - graph_t: transpose(graph), if already computed
+#
+# output:
+#  - path:    a shortest acyclic path (as list) or 'None' if no path exists
+#
+# notes:
+#  - performs two breath-first searches, forwards from 'start' in 'graph' and
+#    backwards from 'end' in 'graph_t', always expanding the smaller rim
+#  - a whole level is expanded before checking where the searches met, since the
+#    first meeting node found is not necessarily on a shortest path
+#  - if rims grow by a factor b per level the searches visit about 2 * b**(d/2)
+#    nodes instead of b**d
+#  - transposing is O(V+E), so pass in 'graph_t' when doing many queries
+#
+def bfs_ss_shortest_bidirectional(graph, start, end, graph_t=None):
+    if start == end:
+        return [start]
+    if graph_t is None: graph_t = transpose(graph)
+    parent_f = { start: None }
+    parent_b = { end: None }
+    distance_f = { start: 0 }
+    distance_b = { end: 0 }
+    rim_f = [start]
+    rim_b = [end]
+    while rim_f and rim_b:
+        if len(rim_f) <= len(rim_b):
+            rim_f, meeting = _bfs_expand_rim(graph, rim_f, parent_f, distance_f, distance_b)
+        else:
+            rim_b, meeting = _bfs_expand_rim(graph_t, rim_b, parent_b, distance_b, distance_f)
+        if meeting != None:
+            # join the forward path to 'meeting' with the backward path from it
+            return path_from(parent_f, start, meeting) + path_from(parent_b, end, meeting)[-2::-1]
+    return None
+
+
+#
+# expands a full level of one side of the above, returning the new rim and the
+# newly discovered node closest to the other side (if any was seen by it)
+#
+def _bfs_expand_rim(graph, rim, parent, distance, distance_other):
+    next_rim = []
+    meeting = None
+    for node in rim:
+        for adjacent in graph.neighbours(node):
+            if adjacent in parent: continue
+            parent[adjacent] = node
+            distance[adjacent] = distance[node] + 1
+            next_rim.append(adjacent)
+            if adjacent in distance_other:
+                if meeting == None or distance_other[adjacent] < distance_other[meeting]:
+                    meeting = adjacent
+    return next_rim, meeting
 
 
 #
@@ -533,6 +811,7 @@ def bfs_ss_shortest_cormen_optimised(graph, start, end):
 # input:
 #  - graph:    directed, may be cyclic (dict+list representation)
 #  - start:    root node to search from
+#  - stats:    'TraversalStats' to count into, as in 'dfs_visit' (optional)
 #
 # output:
 #  - parent:   parent relationship to 'start' for all nodes in graph
@@ -540,8 +819,10 @@ def bfs_ss_shortest_cormen_optimised(graph, start, end):
 #
 # notes:
 #  - performs a breath-first search
+#  - with 'stats', nodes are counted as they are taken off the rim, along with
+#    the rim size at that point
 #       
-def bfs_sm_shortest_cormen(graph, start):
+def bfs_sm_shortest_cormen(graph, start, stats=None):
     # set properties for start node
     parent = { start: None }
     distance = { start: 0 }
@@ -552,8 +833,10 @@ def bfs_sm_shortest_cormen(graph, start):
     while rim:
         # get next node on the rim
         node = rim.popleft()
+        neighbours = graph.neighbours(node)
+        if stats is not None: stats.discover(len(neighbours), len(rim) + 1)
         # explore its adjacent nodes
-        for adjacent in graph.neighbours(node):
+        for adjacent in neighbours:
             # skip if already discovered (grey)
             if adjacent in greyed: continue
             # if new then record properties
@@ -566,6 +849,91 @@ def bfs_sm_shortest_cormen(graph, start):
     return parent, distance
 
 
+#
+# lazy version of the above
+#
+# input:
+#  - graph:     directed, may be cyclic (dict+list representation)
+#  - start:     root node to search from
+#  - max_depth: nodes further than this from 'start' are not visited (no limit if not given)
+#
+# output:
+#  - visits:    (node, depth, parent) for every node reached, yielded in breath-first
+#               order as they are discovered ('parent' is None for 'start')
+#
+# notes:
+#  - nothing is searched beyond what has been asked for, so a caller that stops
+#    early (eg. when a node matches) stops the search too
+#  - holds the rim and the discovered nodes only, not 'parent' or 'distance' for
+#    all of them
+#
+def bfs_iter(graph, start, max_depth=None):
+    greyed = set([start])
+    yield start, 0, None
+    rim = deque([(start, 0)])
+    while rim:
+        node, depth = rim.popleft()
+        # do not expand nodes at the depth limit
+        if depth == max_depth: continue
+        for adjacent in graph.neighbours(node):
+            if adjacent in greyed: continue
+            greyed.add(adjacent)
+            yield adjacent, depth + 1, node
+            rim.append((adjacent, depth + 1))
+
+
+#
+# as above, but depth-first, in the order 'dfs_visit' discovers nodes
+#
+# notes:
+#  - 'depth' is the depth in the DFS tree, which may be more than the distance
+#    from 'start'; with 'max_depth' the search does not go deeper than it, so a node
+#    first reached too deep is not visited even if a shorter path exists
+#
+def dfs_iter(graph, start, max_depth=None):
+    greyed = set([start])
+    yield start, 0, None
+    stack = [(start, iter(graph.neighbours(start)))]
+    while stack:
+        # continue with the deepest node where it left off
+        node, adjacents = stack[-1]
+        depth = len(stack) - 1
+        if depth == max_depth:
+            stack.pop()
+            continue
+        for adjacent in adjacents:
+            if adjacent in greyed: continue
+            greyed.add(adjacent)
+            yield adjacent, depth + 1, node
+            stack.append((adjacent, iter(graph.neighbours(adjacent))))
+            break
+        else:
+            stack.pop()
+
+
+#
+# input:
+#  - graph:     directed, may be cyclic (dict+list representation)
+#  - start:     root node to search from
+#  - matches:   called as matches(node) on nodes in order of distance to 'start'
+#  - max_depth: how far to look (no limit if not given)
+#
+# output:
+#  - nearest:   (node, distance) for the nearest node that matches, or 'None'
+#
+def bfs_nearest(graph, start, matches, max_depth=None):
+    for (node, depth, parent) in bfs_iter(graph, start, max_depth):
+        if matches(node): return node, depth
+    return None
+
+
+#
+# all nodes within 'k' edges of 'start' (as set), including 'start'
+#
+def bfs_neighbourhood(graph, start, k):
+    return set(node for (node, depth, parent) in bfs_iter(graph, start, k))
+
+
 
 
 
@@ -594,6 +962,79 @@ def topological_sort(graph):
     return [k for (k,v) in sorted_f]
 
 
+#
+# from Kahn, "Topological sorting of large networks"
+#
+# input:
+#  - graph:    directed, acyclic (dict+list representation)
+#
+# output:
+#  - ordering: topological ordering for the nodes (as list)
+#
+# notes:
+#  - repeatedly takes a node with no incoming edges left, and removes its outgoing
+#    edges by lowering the in-degree of its adjacent nodes: O(V+E), with no DFS
+#    and no sorting by finishing time
+#  - 'ordering' doubles as the FIFO queue of nodes ready to be taken
+#  - nodes on a cycle never run out of incoming edges, so if some nodes are left
+#    over the graph is not acyclic and ValueError is raised
+#
+def topological_sort_kahn(graph):
+    indegree = _indegrees(graph)
+    ordering = [ node for node in graph.nodes() if indegree[node] == 0 ]
+    i = 0
+    while i < len(ordering):
+        for adjacent in graph.neighbours(ordering[i]):
+            indegree[adjacent] -= 1
+            if indegree[adjacent] == 0: ordering.append(adjacent)
+        i += 1
+    if len(ordering) < len(indegree):
+        raise ValueError("Graph has a cycle, {0} nodes could not be ordered".format(len(indegree) - len(ordering)))
+    return ordering
+
+
+#
+# wavefront version of the above
+#
+# input:
+#  - graph:  directed, acyclic (dict+list representation)
+#
+# output:
+#  - levels: groups of nodes (as lists), yielded one at a time, such that every
+#            node only has incoming edges from nodes in earlier groups
+#
+# notes:
+#  - nodes in the same group do not depend on each other and can be processed
+#    concurrently, once all earlier groups are done
+#  - a group is the set of nodes whose last incoming edge came from the group before
+#  - raises ValueError once no more groups can be formed if the graph has a cycle,
+#    so groups yielded before that are only those not depending on a cycle
+#
+def topological_levels(graph):
+    indegree = _indegrees(graph)
+    level = [ node for node in graph.nodes() if indegree[node] == 0 ]
+    ordered = 0
+    while level:
+        yield level
+        ordered += len(level)
+        next_level = []
+        for node in level:
+            for adjacent in graph.neighbours(node):
+                indegree[adjacent] -= 1
+                if indegree[adjacent] == 0: next_level.append(adjacent)
+        level = next_level
+    if ordered < len(indegree):
+        raise ValueError("Graph has a cycle, {0} nodes could not be ordered".format(len(indegree) - ordered))
+
+
+def _indegrees(graph):
+    indegree = dict.fromkeys(graph.nodes(), 0)
+    for node in graph.nodes():
+        for adjacent in graph.neighbours(node):
+            indegree[adjacent] = indegree.get(adjacent, 0) + 1
+    return indegree
+
+
 
 
 
@@ -621,7 +1062,12 @@ def forest(parent):
     return roots, Graph(graph)
 
 
-def reachable(graph, root):
+def reachable(graph, root, stats=None):
+    return dfs_visit(graph, [root], stats=stats)
+
+
+# path-copying version of the above, kept for comparison
+def reachable_copying(graph, root):
     reached = set([root])
     # prepare loop variable
     path = [root]
@@ -664,24 +1110,34 @@ def reachable(graph, root):
 #          since C' -> C edge will mean visiting all x \in C not already greyed
 #        - if some x \in C picked before x' then all x \in C not already greyed will be visited
 #          yet no x \in C will be, since C' -> C imply C -/-> C' when C, C' are maximum
-def strongly_connected_components(graph):
+#
+# with 'stats' (optional) the searches are counted as in 'dfs_visit', and every step
+# below timed as a phase of its own
+#
+def strongly_connected_components(graph, stats=None):
     # use first DFS to get finished times
-    _,_,f1 = timeddfs_sm_any_cormen_extended(graph)
+    with phase(stats, 'first dfs'):
+        _,_,f1 = timeddfs_sm_any_cormen_extended(graph, stats=stats)
     # sort nodes according to finished time
-    first = lambda (x,y): x
-    second = lambda (x,y): y
-    f1_sorted = sorted(f1.iteritems(), key=second, reverse=True)
-    nodes_sorted = map(first, f1_sorted)
+    with phase(stats, 'sort'):
+        first = lambda (x,y): x
+        second = lambda (x,y): y
+        f1_sorted = sorted(f1.iteritems(), key=second, reverse=True)
+        nodes_sorted = map(first, f1_sorted)
     # use second DFS to get component trees
-    graph_t = transpose(graph)
-    p2,_,_ = timeddfs_sm_any_cormen_extended(graph_t, nodes_sorted)
+    with phase(stats, 'transpose'):
+        graph_t = transpose(graph)
+    with phase(stats, 'second dfs'):
+        p2,_,_ = timeddfs_sm_any_cormen_extended(graph_t, nodes_sorted, stats)
     # find roots and parent trees
-    roots, trees = forest(p2)
+    with phase(stats, 'forest'):
+        roots, trees = forest(p2)
     # compute components by reachability from each root
-    components = []
-    for root in roots:
-        component = reachable(trees, root)
-        components.append(component)
+    with phase(stats, 'reachable'):
+        components = []
+        for root in roots:
+            component = reachable(trees, root, stats)
+            components.append(component)
     return components
 
 
@@ -691,7 +1147,22 @@ def strongly_connected_components(graph):
 
 
 
-def timeddfs_sm_any_cormen_extended_finished(graph, rootNodes=None):
+def timeddfs_sm_any_cormen_extended_finished(graph, rootNodes=None, stats=None):
+    finished = []
+    dfs_visit(graph, rootNodes, finish=finished.append, stats=stats)
+    return finished
+
+
+def timeddfs_sm_any_cormen_extended_components(graph, rootNodes=None, stats=None):
+    components = []
+    root = lambda node: components.append(set())
+    discover = lambda node: components[-1].add(node)
+    dfs_visit(graph, rootNodes, discover=discover, root=root, stats=stats)
+    return components
+
+
+# path-copying versions of the above, kept for comparison
+def timeddfs_sm_any_cormen_extended_finished_copying(graph, rootNodes=None):
     finished = []
     greyed = set()
     if not rootNodes: rootNodes = graph.nodes()
@@ -719,7 +1190,7 @@ def timeddfs_sm_any_cormen_extended_finished(graph, rootNodes=None):
     return finished
 
 
-def timeddfs_sm_any_cormen_extended_components(graph, rootNodes=None):
+def timeddfs_sm_any_cormen_extended_components_copying(graph, rootNodes=None):
     components = []
     greyed = set()
     if not rootNodes: rootNodes = graph.nodes()
@@ -750,13 +1221,95 @@ def timeddfs_sm_any_cormen_extended_components(graph, rootNodes=None):
     return components
 
 
-def strongly_connected_components_optimised(graph):
+def strongly_connected_components_optimised(graph, stats=None):
     # use first DFS to get finished times
-    f = timeddfs_sm_any_cormen_extended_finished(graph)
+    with phase(stats, 'first dfs'):
+        f = timeddfs_sm_any_cormen_extended_finished(graph, stats=stats)
     # use second DFS to get component trees
-    graph_t = transpose(graph)
+    with phase(stats, 'transpose'):
+        graph_t = transpose(graph)
     f.reverse()		# in-place reversal 
-    components = timeddfs_sm_any_cormen_extended_components(graph_t, f)
+    with phase(stats, 'second dfs'):
+        components = timeddfs_sm_any_cormen_extended_components(graph_t, f, stats)
+    return components
+
+
+#
+# from Pearce, "A space-efficient algorithm for finding strongly connected components"
+#  - Tarjan's algorithm with a single 'rindex' dictionary instead of index, lowlink
+#    and on-stack bookkeeping
+#
+# input:
+#  - graph:      directed, may be cyclic (dict+list representation)
+#  - stats:      'TraversalStats' to count into, as in 'dfs_visit' (optional)
+#
+# output:
+#  - components: the strongly connected components in the graph (as list of sets)
+#
+# notes:
+#  - a single depth-first search, and no transpose(graph), unlike the two above
+#  - modified to avoid (non-tail-) recursive calls; every frame on 'path' holds a
+#    node, a cursor into its adjacent nodes, and whether it is still a candidate root
+#  - 'rindex' starts as the discovery index of a node and is lowered to the smallest
+#    index reachable through nodes not yet in a component; a node that keeps its own
+#    index is the root of a component
+#  - finished components get numbers counting down from n-1, which are larger than
+#    any discovery index in use, so edges into them never lower 'rindex'
+#  - components are found in reverse topological order, so they are reversed to
+#    come out in the same (topological) order as above
+#
+def strongly_connected_components_pearce(graph, stats=None):
+    rindex = dict()
+    index = 0
+    c = len(graph.nodes()) - 1
+    stack = []          # visited nodes not yet in a component
+    components = []
+    for root in graph.nodes():
+        # skip if already discovered
+        if root in rindex: continue
+        rindex[root] = index
+        index += 1
+        neighbours = graph.neighbours(root)
+        if stats is not None: stats.discover(len(neighbours), 1)
+        path = [[root, iter(neighbours), True]]
+        while path:
+            frame = path[-1]
+            node = frame[0]
+            for adjacent in frame[1]:
+                if not adjacent in rindex:
+                    # if new then record its index and make it the new pivot
+                    rindex[adjacent] = index
+                    index += 1
+                    neighbours = graph.neighbours(adjacent)
+                    path.append([adjacent, iter(neighbours), True])
+                    if stats is not None: stats.discover(len(neighbours), len(path))
+                    break
+                if rindex[adjacent] < rindex[node]:
+                    rindex[node] = rindex[adjacent]
+                    frame[2] = False
+            else:
+                path.pop()
+                if frame[2]:
+                    # 'node' is a root so it and the nodes above it on the stack form a component
+                    index -= 1
+                    component = set([node])
+                    while stack and rindex[node] <= rindex[stack[-1]]:
+                        adjacent = stack.pop()
+                        rindex[adjacent] = c
+                        index -= 1
+                        component.add(adjacent)
+                    rindex[node] = c
+                    c -= 1
+                    components.append(component)
+                else:
+                    stack.append(node)
+                # pass the lowered 'rindex' on to the parent
+                if path:
+                    parent = path[-1]
+                    if rindex[node] < rindex[parent[0]]:
+                        rindex[parent[0]] = rindex[node]
+                        parent[2] = False
+    components.reverse()
     return components
 
 
@@ -773,166 +1326,8 @@ def strongly_connected_components_optimised(graph):
         
 if __name__ == '__main__':
 
-    from random_graph_generation import random_dictlist_graph_sample_split_set_optimised as random_dictlist_graph
-
-    from timeit import Timer
-    import gc
-
-
-
-
-    randgraph_10x50 = Graph(random_dictlist_graph(10, 50))
-    randgraph_20x100 = Graph(random_dictlist_graph(20, 100))
-
-    print "\n*** Tests for 'pythondocs' DFS methods: ***\n"
-
-    tests = [   ("randgraph_10x50", 0, 9),
-                ("randgraph_20x100", 0, -1)    ]
-
-    algos = [   "dfs_ss_any_pythondocs",
-                "dfs_ss_all_pythondocs",
-                "dfs_ss_shortest_pythondocs" ]
-
-    for test in tests:
-        graphName = test[0]
-        start = test[1]
-        end = test[2]
-        print "* {0}, from {1} to {2} *".format(graphName, start, end)
-        graph = locals()[graphName]
-        for algo in algos:
-            algocode = locals()[algo]
-            time = Timer(lambda: algocode(graph, start, end)).timeit(number=3)
-            print "{0:<55} : {1}".format(algo, time)
-            gc.collect()
-        print ""
-
-
-
-
-    print "\n*** Tests for 'cormen' DFS methods: ***\n"
-
-    randgraph_100x5000 = Graph(random_dictlist_graph(100, 5000))
-    randgraph_10000x1000000 = Graph(random_dictlist_graph(10000,1000000))
-    randgraph_20000x3500000 = Graph(random_dictlist_graph(20000,3500000))
-
-    tests = [   ("randgraph_10x50", 0, 9),
-                ("randgraph_20x100", 0, -1),
-
-                ("randgraph_100x5000", 0, 4500),
-                ("randgraph_10000x1000000", 0, 900000),
-                ("randgraph_20000x3500000", 0, 3400000)     ]
-
-    algos = [   "dfs_sm_any_cormen",
-                "timeddfs_sm_any_cormen"    ]
-
-    for test in tests:
-        graphName = test[0]
-        start = test[1]
-        end = test[2]
-        print "* {0}, from {1} to {2} *".format(graphName, start, end)
-        graph = locals()[graphName]
-        for algo in algos:
-            algocode = locals()[algo]
-            time = Timer(lambda: algocode(graph, start)).timeit(number=3)
-            print "{0:<55} : {1}".format(algo, time)
-            gc.collect()
-        print ""
-
-
-
-
-    print "\n*** Tests for 'cormen_extended' DFS methods: ***\n"
-
-    algos = [   "dfs_sm_any_cormen_extended",
-                "timeddfs_sm_any_cormen_extended"   ]
-
-    for test in tests:
-        graphName = test[0]
-        start = test[1]
-        end = test[2]
-        print "* {0}, from {1} to {2} *".format(graphName, start, end)
-        graph = locals()[graphName]
-        for algo in algos:
-            algocode = locals()[algo]
-            time = Timer(lambda: algocode(graph, [0])).timeit(number=3)
-            print "{0:<55} : {1}".format(algo, time)
-            gc.collect()
-        print ""
-    print "\n"
-
-
-
-
-
-    print "\n*** Tests for 'ss_cormen' BFS methods: ***\n"
-
-    tests = [   ("randgraph_10x50", 0, 9),
-                ("randgraph_20x100", 0, -1),
-
-                ("randgraph_100x5000", 0, 4500),
-                ("randgraph_10000x1000000", 0, 900000),
-                ("randgraph_20000x3500000", 0, 3400000)     ]
-
-    algos = [   "bfs_ss_shortest_cormen",
-                "bfs_ss_shortest_cormen_optimised"          ]
-
-    for test in tests:
-        graphName = test[0]
-        start = test[1]
-        end = test[2]
-        print "* {0}, from {1} to {2} *".format(graphName, start, end)
-        graph = locals()[graphName]
-        for algo in algos:
-            algocode = locals()[algo]
-            time = Timer(lambda: algocode(graph, start, end)).timeit(number=3)
-            print "{0:<55} : {1}".format(algo, time)
-            gc.collect()
-        print ""
-    print "\n"
-
-
-
-
-    print "\n*** Tests for 'sm_cormen' BFS methods: ***\n"
-
-    algos = [  "bfs_sm_shortest_cormen"  ]
-
-    for test in tests:
-        graphName = test[0]
-        start = test[1]
-        end = test[2]
-        print "* {0}, from {1} to {2} *".format(graphName, start, end)
-        graph = locals()[graphName]
-        for algo in algos:
-            algocode = locals()[algo]
-            time = Timer(lambda: algocode(graph, start)).timeit(number=3)
-            print "{0:<55} : {1}".format(algo, time)
-            gc.collect()
-        print ""
-    print "\n"
-
-
-
-
-    print "\n*** Tests for 'strongly_connected_components' methods: ***\n"
-
-    tests = [   "randgraph_10x50",
-                "randgraph_20x100",
-
-                "randgraph_100x5000",
-                "randgraph_10000x1000000",
-                "randgraph_20000x3500000"     ]
-
-    algos = [  "strongly_connected_components",
-               "strongly_connected_components_optimised"  ]
+    # the benchmarks live in their own module, see there for options
+    import sys
+    from benchmark_graph_algorithms import main
 
-    for test in tests:
-        print "* {0} *".format(test)
-        graph = locals()[test]
-        for algo in algos:
-            algocode = locals()[algo]
-            time = Timer(lambda: algocode(graph)).timeit(number=3)
-            print "{0:<55} : {1}".format(algo, time)
-            gc.collect()
-        print ""
-    print "\n"
+    sys.exit(main())
@@ -0,0 +1,954 @@
+from array import array
+from binascii import hexlify
+from mmap import mmap, ACCESS_READ, ACCESS_WRITE
+from uuid import uuid4
+import os
+import struct
+import sys
+import tempfile
+
+
+# ********
+#
+# compressed sparse row (CSR) representation
+#  - nodes are the integers 0..n-1
+#  - edges as one flat array of targets, sliced per node by an offsets array
+#
+# ********
+
+#
+# input:
+#  - offsets: n+1 increasing positions into 'targets' (array of type 'l')
+#  - targets: adjacent nodes of all nodes, back to back (array of type 'i')
+#
+# notes:
+#  - the neighbours of 'node' are targets[offsets[node]:offsets[node+1]]
+#  - same interface as 'Graph' so all traversal functions run unchanged
+#  - an edge costs 4 bytes (a machine int) instead of a list slot pointing
+#    to a Python int object (8 + 24 bytes, plus list over-allocation)
+#  - nodes are limited to 2**31-1 by the type of 'targets'
+#
+class CSRGraph:
+
+    def __init__(self, offsets, targets):
+        self._offsets = offsets
+        self._targets = targets
+
+    def nodes(self):
+        return xrange(len(self._offsets) - 1)
+
+    def has_node(self, node):
+        return 0 <= node < len(self._offsets) - 1
+
+    def neighbours(self, node):
+        if not self.has_node(node): return []
+        # slicing an array gives a (compact) array, not a list
+        return self._targets[self._offsets[node]:self._offsets[node+1]]
+
+    def offsets(self):
+        return self._offsets
+
+    def targets(self):
+        return self._targets
+
+    def no_nodes(self):
+        return len(self._offsets) - 1
+
+    def no_edges(self):
+        return len(self._targets)
+
+    def size_in_bytes(self):
+        return sys.getsizeof(self._offsets) + sys.getsizeof(self._targets)
+
+
+#
+# input:
+#  - dictlist: nodes 0..n-1 as keys, adjacency lists as values
+#
+# output:
+#  - graph:    the same graph in CSR representation
+#
+# notes:
+#  - adjacency lists keep their order, so traversals visit nodes in the same order
+#
+def csrgraph_from_dictlist(dictlist):
+    no_nodes = len(dictlist)
+    offsets = array('l', [0])
+    targets = array('i')
+    for node in xrange(no_nodes):
+        if not node in dictlist: raise ValueError("Nodes must be the integers 0..n-1")
+        targets.extend(dictlist[node])
+        offsets.append(len(targets))
+    _check_targets(targets, no_nodes)
+    return CSRGraph(offsets, targets)
+
+
+#
+# as above but for anything with the 'Graph' interface
+#
+def csrgraph_from_graph(graph):
+    no_nodes = len(graph.nodes())
+    offsets = array('l', [0])
+    targets = array('i')
+    for node in xrange(no_nodes):
+        if not graph.has_node(node): raise ValueError("Nodes must be the integers 0..n-1")
+        targets.extend(graph.neighbours(node))
+        offsets.append(len(targets))
+    _check_targets(targets, no_nodes)
+    return CSRGraph(offsets, targets)
+
+
+#
+# input:
+#  - nodes:    the integers 0..n-1 (as list or xrange)
+#  - edges:    (node, adjacent) pairs in any order, as any iterable
+#
+# output:
+#  - graph:    the same graph in CSR representation
+#
+# notes:
+#  - the form produced by the 'random_listlist_graph_*' generators
+#  - a counting sort by node: one pass to record edges and count degrees, and
+#    one to place every adjacent node, keeping the order they came in
+#
+def csrgraph_from_listlist(nodes, edges):
+    no_nodes = len(nodes)
+    sources = array('i')
+    adjacents = array('i')
+    for (node, adjacent) in edges:
+        sources.append(node)
+        adjacents.append(adjacent)
+    _check_targets(sources, no_nodes)
+    _check_targets(adjacents, no_nodes)
+    # offsets from degrees
+    offsets = array('l', [0]) * (no_nodes + 1)
+    for node in sources:
+        offsets[node + 1] += 1
+    for node in xrange(no_nodes):
+        offsets[node + 1] += offsets[node]
+    # place adjacent nodes, using a copy of the offsets as cursors
+    cursors = offsets[:-1]
+    targets = array('i', [0]) * len(adjacents)
+    for (node, adjacent) in zip(sources, adjacents):
+        targets[cursors[node]] = adjacent
+        cursors[node] += 1
+    return CSRGraph(offsets, targets)
+
+
+#
+# as above, but for edges sorted by node
+#
+# notes:
+#  - the form produced by the 'random_edges_gnp' generator
+#  - a single pass, appending adjacent nodes as they come: no copy of the edges is
+#    kept, so a lazy 'edges' is built in O(n+m) memory for the result only
+#
+def csrgraph_from_sorted_edges(nodes, edges):
+    no_nodes = len(nodes)
+    offsets = array('l', [0])
+    targets = array('i')
+    offsets_append = offsets.append
+    targets_append = targets.append
+    current = 0
+    for (node, adjacent) in edges:
+        if node < current: raise ValueError("Edges must be sorted by node")
+        while current < node:
+            offsets_append(len(targets))
+            current += 1
+        targets_append(adjacent)
+    if current >= no_nodes and targets: raise ValueError("Nodes must be the integers 0..n-1")
+    while current < no_nodes:
+        offsets_append(len(targets))
+        current += 1
+    _check_targets(targets, no_nodes)
+    return CSRGraph(offsets, targets)
+
+
+def _check_targets(targets, no_nodes):
+    if targets and (min(targets) < 0 or max(targets) >= no_nodes):
+        raise ValueError("Adjacent nodes must be the integers 0..n-1")
+
+
+#
+# input:
+#  - graph:    anything with the 'Graph' interface
+#
+# output:
+#  - dictlist: nodes as keys, adjacency lists as values (as wrapped by 'Graph')
+#
+def dictlist_from_graph(graph):
+    dictlist = {}
+    for node in graph.nodes():
+        dictlist[node] = list(graph.neighbours(node))
+    return dictlist
+
+
+#
+# input:
+#  - dictlist: nodes as keys, adjacency lists as values
+#
+# output:
+#  - size:     bytes used by the dict, its lists, and the int objects they hold
+#
+# notes:
+#  - int objects shared between lists (eg. the small int cache) are counted once
+#
+def dictlist_size_in_bytes(dictlist):
+    size = sys.getsizeof(dictlist)
+    seen = set()
+    for (node, adjacents) in dictlist.iteritems():
+        size += sys.getsizeof(adjacents)
+        for item in [node] + list(adjacents):
+            if id(item) in seen: continue
+            seen.add(id(item))
+            size += sys.getsizeof(item)
+    return size
+
+
+
+
+
+# ********
+#
+# bit-matrix representation
+#  - nodes are the integers 0..n-1
+#  - edges as one row of n bits per node, held in a Python int
+#
+# ********
+
+# graphs with more than this fraction of the n**2 possible edges are dense
+BITSET_DENSITY = 1.0 / 32
+
+
+#
+# input:
+#  - rows: one int per node, with bit j of rows[i] set if there is an edge i -> j
+#
+# notes:
+#  - same interface as 'Graph', but 'neighbours' decodes a row on every call: the
+#    algorithms in 'bitset_graph_algorithms' work on whole rows with 'row' instead
+#  - a row costs n bits whatever the number of edges, so n**2 / 8 bytes in all;
+#    at 1/32 of all edges that is 4 bytes per edge, as for 'CSRGraph'
+#
+class BitsetGraph:
+
+    def __init__(self, rows):
+        self._rows = rows
+
+    def nodes(self):
+        return xrange(len(self._rows))
+
+    def has_node(self, node):
+        return 0 <= node < len(self._rows)
+
+    def neighbours(self, node):
+        if not self.has_node(node): return []
+        return nodes_from_bits(self._rows[node])
+
+    def row(self, node):
+        return self._rows[node]
+
+    def rows(self):
+        return self._rows
+
+    def no_nodes(self):
+        return len(self._rows)
+
+    def no_edges(self):
+        return sum(bin(row).count('1') for row in self._rows)
+
+    def size_in_bytes(self):
+        return sys.getsizeof(self._rows) + sum(sys.getsizeof(row) for row in self._rows)
+
+
+#
+# input:
+#  - bits:  a Python int, as a set of nodes
+#
+# output:
+#  - nodes: the nodes in it, in increasing order (as list)
+#
+def nodes_from_bits(bits):
+    nodes = []
+    # walk the bits from the least significant end
+    bits = bin(bits)[:1:-1]
+    node = bits.find('1')
+    while node >= 0:
+        nodes.append(node)
+        node = bits.find('1', node + 1)
+    return nodes
+
+
+# little-endian bytes to int, without a shift and or per bit
+def _int_from_bytes(row):
+    row.reverse()
+    return int(hexlify(row), 16) if row else 0
+
+
+#
+# input:
+#  - graph: anything with the 'Graph' interface, nodes 0..n-1
+#
+# output:
+#  - graph: the same graph in bit-matrix representation
+#
+# notes:
+#  - a row is filled in as bytes, then turned into an int in one go
+#  - multiple edges between the same nodes become one
+#
+def bitsetgraph_from_graph(graph):
+    no_nodes = len(graph.nodes())
+    rows = []
+    for node in xrange(no_nodes):
+        if not graph.has_node(node): raise ValueError("Nodes must be the integers 0..n-1")
+        adjacents = graph.neighbours(node)
+        _check_targets(adjacents, no_nodes)
+        row = bytearray((no_nodes + 7) // 8)
+        for adjacent in adjacents:
+            row[adjacent >> 3] |= 1 << (adjacent & 7)
+        rows.append(_int_from_bytes(row))
+    return BitsetGraph(rows)
+
+
+#
+# input:
+#  - graph:     anything with the 'Graph' interface, nodes 0..n-1
+#  - threshold: fraction of the n**2 possible edges from which a graph is dense
+#
+# output:
+#  - graph:     'graph' as a 'BitsetGraph' if it is dense, otherwise unchanged
+#
+def dense_graph(graph, threshold=BITSET_DENSITY):
+    if isinstance(graph, BitsetGraph): return graph
+    no_nodes = len(graph.nodes())
+    no_edges = sum(len(graph.neighbours(node)) for node in graph.nodes())
+    if no_edges > threshold * no_nodes**2: return bitsetgraph_from_graph(graph)
+    return graph
+
+
+
+
+
+# ********
+#
+# compressed adjacency lists
+#  - nodes are the integers 0..n-1
+#  - edges as the gaps between sorted adjacent nodes, in varints, back to back in
+#    one byte buffer sliced per node by an offsets array
+#
+# ********
+
+#
+# input:
+#  - offsets:  n+1 increasing positions into 'data' (array of type 'l')
+#  - data:     encoded adjacent nodes of all nodes, back to back (bytearray)
+#  - no_edges: number of edges encoded
+#
+# notes:
+#  - every adjacency list is sorted and stored as its first node followed by the
+#    gaps between consecutive nodes, each as a varint: 7 bits per byte, least
+#    significant first, with the top bit set on all bytes but the last
+#  - gaps are at most n / degree on average, so an edge takes 1 byte as long as the
+#    average degree is above n / 128, and 2 bytes up to n / 16384
+#  - same interface as 'Graph', but 'neighbours' decodes the list on every call
+#    (in increasing order), trading time for memory: only the lists in use are
+#    ever held as Python ints
+#
+class CompressedGraph:
+
+    def __init__(self, offsets, data, no_edges):
+        self._offsets = offsets
+        self._data = data
+        self._no_edges = no_edges
+
+    def nodes(self):
+        return xrange(len(self._offsets) - 1)
+
+    def has_node(self, node):
+        return 0 <= node < len(self._offsets) - 1
+
+    def neighbours(self, node):
+        if not self.has_node(node): return []
+        adjacents = []
+        adjacents_append = adjacents.append
+        adjacent = gap = shift = 0
+        for byte in self._data[self._offsets[node]:self._offsets[node+1]]:
+            if byte < 128:
+                adjacent += gap | (byte << shift)
+                adjacents_append(adjacent)
+                gap = shift = 0
+            else:
+                gap |= (byte & 127) << shift
+                shift += 7
+        return adjacents
+
+    def no_nodes(self):
+        return len(self._offsets) - 1
+
+    def no_edges(self):
+        return self._no_edges
+
+    def size_in_bytes(self):
+        return sys.getsizeof(self._offsets) + sys.getsizeof(self._data)
+
+
+#
+# input:
+#  - graph: anything with the 'Graph' interface, nodes 0..n-1
+#
+# output:
+#  - graph: the same graph in compressed representation
+#
+# notes:
+#  - adjacency lists are sorted as they are encoded, so traversals visit nodes in
+#    increasing order, which is the same order unless they already were sorted
+#
+def compressedgraph_from_graph(graph):
+    no_nodes = len(graph.nodes())
+    offsets = array('l', [0])
+    data = bytearray()
+    no_edges = 0
+    for node in xrange(no_nodes):
+        if not graph.has_node(node): raise ValueError("Nodes must be the integers 0..n-1")
+        adjacents = graph.neighbours(node)
+        _check_targets(adjacents, no_nodes)
+        _encode_gaps(data, adjacents)
+        offsets.append(len(data))
+        no_edges += len(adjacents)
+    return CompressedGraph(offsets, data, no_edges)
+
+
+#
+# as above, but for the dict+list representation
+#
+def compressedgraph_from_dictlist(dictlist):
+    no_nodes = len(dictlist)
+    offsets = array('l', [0])
+    data = bytearray()
+    no_edges = 0
+    for node in xrange(no_nodes):
+        if not node in dictlist: raise ValueError("Nodes must be the integers 0..n-1")
+        adjacents = dictlist[node]
+        _check_targets(adjacents, no_nodes)
+        _encode_gaps(data, adjacents)
+        offsets.append(len(data))
+        no_edges += len(adjacents)
+    return CompressedGraph(offsets, data, no_edges)
+
+
+# appends the sorted 'adjacents' to 'data', as the first and then the gaps, in varints
+def _encode_gaps(data, adjacents):
+    data_append = data.append
+    previous = 0
+    for adjacent in sorted(adjacents):
+        gap = adjacent - previous
+        previous = adjacent
+        while gap >= 128:
+            data_append((gap & 127) | 128)
+            gap >>= 7
+        data_append(gap)
+
+
+
+
+
+# ********
+#
+# memory-mapped CSR representation
+#  - the CSR arrays laid out back to back in one buffer, read in place
+#
+# ********
+
+#
+# layout (little-endian):
+#  - header:  magic string, number of nodes n, number of edges m
+#  - offsets: n+1 signed 8 byte integers
+#  - targets: m signed 4 byte integers
+#
+_HEADER = struct.Struct('<8sqq')
+_MAGIC = 'CSRGRAPH'
+_OFFSETS = struct.Struct('<2q')
+
+
+#
+# input:
+#  - graph:   anything with the 'Graph' interface, nodes 0..n-1
+#  - fileobj: open (binary) file to write the layout above to
+#
+def _write_csr(graph, fileobj):
+    if not isinstance(graph, CSRGraph): graph = csrgraph_from_graph(graph)
+    fileobj.write(_HEADER.pack(_MAGIC, graph.no_nodes(), graph.no_edges()))
+    _write_array(fileobj, graph.offsets(), 'q')
+    _write_array(fileobj, graph.targets(), 'i')
+
+
+def _write_array(fileobj, items, typecode):
+    if sys.byteorder == 'little' and items.itemsize == struct.calcsize(typecode):
+        items.tofile(fileobj)
+    else:
+        fileobj.write(struct.pack('<{0}{1}'.format(len(items), typecode), *items))
+
+
+#
+# input:
+#  - buffer: anything 'struct.unpack_from' accepts (eg. an mmap) holding the layout above
+#
+# notes:
+#  - same interface as 'Graph', reading adjacent nodes straight from the buffer
+#    on every 'neighbours' call: nothing is loaded up front
+#
+class MappedGraph:
+
+    def __init__(self, buffer):
+        magic, no_nodes, no_edges = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC: raise ValueError("Buffer does not hold a graph")
+        self._buffer = buffer
+        self._no_nodes = no_nodes
+        self._no_edges = no_edges
+        self._targets_start = _HEADER.size + 8 * (no_nodes + 1)
+
+    def nodes(self):
+        return xrange(self._no_nodes)
+
+    def has_node(self, node):
+        return 0 <= node < self._no_nodes
+
+    def neighbours(self, node):
+        if not self.has_node(node): return []
+        first, last = _OFFSETS.unpack_from(self._buffer, _HEADER.size + 8 * node)
+        return struct.unpack_from('<{0}i'.format(last - first), self._buffer, self._targets_start + 4 * first)
+
+    def no_nodes(self):
+        return self._no_nodes
+
+    def no_edges(self):
+        return self._no_edges
+
+
+
+
+
+#
+# as 'MappedGraph', mapped from a file
+#
+# notes:
+#  - opening is constant time: pages are only read (and cached by the OS) when
+#    'neighbours' touches them
+#  - 'release' unmaps the file; the handle must not be used after that
+#
+class FileGraph(MappedGraph):
+
+    def __init__(self, path):
+        fileobj = open(path, 'rb')
+        try:
+            self._mmap = mmap(fileobj.fileno(), 0, access=ACCESS_READ)
+        finally:
+            fileobj.close()
+        MappedGraph.__init__(self, self._mmap)
+
+    def release(self):
+        self._mmap.close()
+
+
+#
+# input:
+#  - graph: anything with the 'Graph' interface, a dict+list graph as made by the
+#           'random_dictlist_graph_*' generators, or a (nodes, edges) pair as made
+#           by the 'random_listlist_graph_*' generators; nodes 0..n-1
+#  - path:  file to write the graph to, in the layout above
+#
+def write_graph(graph, path):
+    if isinstance(graph, dict): graph = csrgraph_from_dictlist(graph)
+    elif isinstance(graph, tuple): graph = csrgraph_from_listlist(*graph)
+    fileobj = open(path, 'wb')
+    try:
+        _write_csr(graph, fileobj)
+    finally:
+        fileobj.close()
+
+
+#
+# input:
+#  - path:  file written by 'write_graph'
+#
+# output:
+#  - graph: the graph, mapped from the file
+#
+def load_graph(path):
+    return FileGraph(path)
+
+
+
+
+
+# ********
+#
+# edge list files
+#  - text: one "node adjacent" pair per line, '#' starts a comment line
+#  - binary: pairs of little-endian 4 byte integers, back to back
+#
+# ********
+
+#
+# input:
+#  - graph:  anything with the 'Graph' interface
+#  - path:   file to write the edges of graph to
+#  - binary: whether to write a binary or a text edge list
+#
+def write_edgelist(graph, path, binary=False):
+    fileobj = open(path, 'wb')
+    try:
+        for node in graph.nodes():
+            adjacents = graph.neighbours(node)
+            if binary:
+                pairs = array('i', [node, 0]) * len(adjacents)
+                pairs[1::2] = array('i', adjacents)
+                _write_array(fileobj, pairs, 'i')
+            else:
+                fileobj.writelines('{0} {1}\n'.format(node, adjacent) for adjacent in adjacents)
+    finally:
+        fileobj.close()
+
+
+# edges in 'path', as arrays holding up to 'chunksize' (node, adjacent) pairs back to back
+#  - a text line other than a comment or a blank line must hold exactly two nodes,
+#    and a binary file a whole number of 8 byte pairs; anything else (eg. a weight
+#    column) would otherwise be paired up into wrong edges
+def _edgelist_chunks(path, binary, chunksize):
+    if binary and os.path.getsize(path) % 8:
+        raise ValueError("Edge list is {0} bytes, not a whole number of 8 byte edges".format(os.path.getsize(path)))
+    fileobj = open(path, 'rb')
+    try:
+        if binary:
+            while True:
+                chunk = array('i')
+                try:
+                    chunk.fromfile(fileobj, 2 * chunksize)
+                except EOFError:
+                    pass    # the last, partial, chunk is kept in 'chunk'
+                if not chunk: break
+                if sys.byteorder != 'little': chunk.byteswap()
+                yield chunk
+            return
+        # one line at a time, straight into the chunk
+        chunk = array('i')
+        chunk_append = chunk.append
+        for (line_no, line) in enumerate(fileobj, 1):
+            if line.startswith('#'): continue
+            fields = line.split()
+            if not fields: continue
+            if len(fields) != 2:
+                raise ValueError("Line {0} of the edge list is not a pair of nodes: {1!r}".format(line_no, line.rstrip()))
+            chunk_append(int(fields[0]))
+            chunk_append(int(fields[1]))
+            if len(chunk) >= 2 * chunksize:
+                yield chunk
+                chunk = array('i')
+                chunk_append = chunk.append
+        if chunk: yield chunk
+    finally:
+        fileobj.close()
+
+
+#
+# input:
+#  - path:      edge list file, as written by 'write_edgelist'
+#  - binary:    whether it is a binary or a text edge list
+#  - output:    file to build the graph in (as 'write_graph'), instead of memory
+#  - chunksize: number of edges to read at a time
+#
+# output:
+#  - graph:     the graph in CSR representation, mapped from 'output' if given;
+#               nodes 0..n-1 with n-1 the largest node in the file
+#  - peak:      largest number of bytes held at once while building (not counting
+#               the targets when they are built in 'output'): the arrays, since
+#               besides them only a line or an edge at a time is held
+#
+# notes:
+#  - reads the file twice, a chunk at a time, and never holds the edges as Python
+#    objects: once to count degrees, and once to place every adjacent node at the
+#    next free slot of its node
+#  - with 'output' only O(n) bytes are held: the targets are written through an
+#    mmap of the output file, so the OS decides how much of them stays in memory
+#
+def csrgraph_from_edgelist(path, binary=False, output=None, chunksize=1000000):
+    # first pass: degrees
+    degrees = array('l')
+    no_edges = 0
+    peak = 0
+    for chunk in _edgelist_chunks(path, binary, chunksize):
+        if min(chunk) < 0: raise ValueError("Nodes must be non-negative integers")
+        largest = max(chunk)
+        if largest >= len(degrees): degrees.extend(array('l', [0]) * (largest + 1 - len(degrees)))
+        for i in xrange(0, len(chunk), 2):
+            degrees[chunk[i]] += 1
+        no_edges += len(chunk) // 2
+        peak = max(peak, sys.getsizeof(degrees) + sys.getsizeof(chunk))
+    no_nodes = len(degrees)
+    # offsets from degrees, replacing them
+    offsets = array('l', [0]) * (no_nodes + 1)
+    for node in xrange(no_nodes):
+        offsets[node + 1] = offsets[node] + degrees[node]
+    del degrees
+    cursors = offsets[:-1]
+    # second pass: targets
+    if output is None:
+        targets = array('i', [0]) * no_edges
+        held = sys.getsizeof(offsets) + sys.getsizeof(cursors) + sys.getsizeof(targets)
+        for chunk in _edgelist_chunks(path, binary, chunksize):
+            for i in xrange(0, len(chunk), 2):
+                node = chunk[i]
+                targets[cursors[node]] = chunk[i + 1]
+                cursors[node] += 1
+            peak = max(peak, held + sys.getsizeof(chunk))
+        return CSRGraph(offsets, targets), peak
+    fileobj = open(output, 'w+b')
+    try:
+        fileobj.write(_HEADER.pack(_MAGIC, no_nodes, no_edges))
+        _write_array(fileobj, offsets, 'q')
+        targets_start = fileobj.tell()
+        fileobj.truncate(targets_start + 4 * no_edges)
+        held = sys.getsizeof(offsets) + sys.getsizeof(cursors)
+        if no_edges:
+            targets = mmap(fileobj.fileno(), 0, access=ACCESS_WRITE)
+            target = struct.Struct('<i')
+            for chunk in _edgelist_chunks(path, binary, chunksize):
+                for i in xrange(0, len(chunk), 2):
+                    node = chunk[i]
+                    target.pack_into(targets, targets_start + 4 * cursors[node], chunk[i + 1])
+                    cursors[node] += 1
+                peak = max(peak, held + sys.getsizeof(chunk))
+            targets.close()
+    finally:
+        fileobj.close()
+    return load_graph(output), peak
+
+
+
+
+
+# ********
+#
+# shared-memory graphs
+#  - a graph published once under a name, and attached to by any process
+#
+# ********
+
+# tmpfs where available, so that the "file" never leaves memory
+_SHARED_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+
+
+#
+# as 'MappedGraph', mapped from a named file in shared memory
+#
+# notes:
+#  - all processes attached to the same name share the same physical pages, so
+#    attaching is constant time and takes no memory of its own
+#  - lifecycle: 'share_graph' (once) -> 'attach_graph' (in every worker, by name)
+#    -> 'release' (in every process using it) -> 'unlink' (once, by the owner)
+#  - after 'release' the handle must not be used; after 'unlink' the name is gone
+#    but processes still attached keep their mapping until they release it
+#
+class SharedGraph(FileGraph):
+
+    def __init__(self, name):
+        self._name = name
+        FileGraph.__init__(self, os.path.join(_SHARED_DIR, name))
+
+    def name(self):
+        return self._name
+
+    def unlink(self):
+        os.unlink(os.path.join(_SHARED_DIR, self._name))
+
+
+#
+# input:
+#  - graph: any graph 'write_graph' accepts
+#  - name:  name to publish it under (a fresh one if not given)
+#
+# output:
+#  - graph: the published graph, attached
+#
+def share_graph(graph, name=None):
+    if name is None: name = 'csrgraph-{0}'.format(uuid4().hex)
+    write_graph(graph, os.path.join(_SHARED_DIR, name))
+    return SharedGraph(name)
+
+
+#
+# input:
+#  - name:  name a graph was published under by 'share_graph'
+#
+# output:
+#  - graph: the published graph, attached
+#
+def attach_graph(name):
+    return SharedGraph(name)
+
+
+
+
+
+# ********
+#
+# performance tests
+#
+# ********
+
+if __name__ == '__main__':
+
+    from random_graph_generation import random_dictlist_graph_sample_split_set_optimised as random_dictlist_graph
+    from elementary_graph_algorithms import Graph, dfs_sm_any_cormen_extended, bfs_sm_shortest_cormen, strongly_connected_components_optimised
+
+    from timeit import Timer
+    import gc
+
+    tests = [   (200,3000), (2000,30000), (2000,1000000), (2000,3000000)    ]
+
+    algos = [   "dfs_sm_any_cormen_extended",
+                "bfs_sm_shortest_cormen",
+                "strongly_connected_components_optimised"   ]
+
+    print "\n*** Memory and traversal time for 'Graph' vs 'CSRGraph': ***\n"
+
+    for test in tests:
+        print test
+        dictlist = random_dictlist_graph(*test)
+        no_edges = sum(len(adjacents) for adjacents in dictlist.itervalues())
+        dictgraph = Graph(dictlist)
+        csrgraph = csrgraph_from_dictlist(dictlist)
+        dict_size = dictlist_size_in_bytes(dictlist)
+        csr_size = csrgraph.size_in_bytes()
+        print "{0:<55} : {1} ({2:.1f} per edge)".format("bytes, Graph", dict_size, float(dict_size) / no_edges)
+        print "{0:<55} : {1} ({2:.1f} per edge)".format("bytes, CSRGraph", csr_size, float(csr_size) / no_edges)
+        for algo in algos:
+            algocode = locals()[algo]
+            for (name, graph) in [("Graph", dictgraph), ("CSRGraph", csrgraph)]:
+                # the extended DFS takes root nodes, the others a single start node
+                arg = [0] if algo == "dfs_sm_any_cormen_extended" else 0
+                if algo == "strongly_connected_components_optimised":
+                    time = Timer(lambda: algocode(graph)).timeit(number=3)
+                else:
+                    time = Timer(lambda: algocode(graph, arg)).timeit(number=3)
+                print "{0:<55} : {1}".format(algo + ", " + name, time)
+                gc.collect()
+        print ""
+
+
+
+    print "\n*** Memory and traversal time for 'Graph' vs 'CompressedGraph': ***\n"
+
+    from random_graph_generation import random_dictlist_graph_sample_split_sorted_optimised as random_dictlist_graph_sorted
+
+    for test in tests + [ (100000,1000000) ]:
+        print test
+        dictlist = random_dictlist_graph_sorted(*test)
+        no_edges = sum(len(adjacents) for adjacents in dictlist.itervalues())
+        dictgraph = Graph(dictlist)
+        time = Timer(lambda: compressedgraph_from_dictlist(dictlist)).timeit(number=1)
+        print "{0:<55} : {1}".format("compressedgraph_from_dictlist", time)
+        compressedgraph = compressedgraph_from_dictlist(dictlist)
+        dict_size = dictlist_size_in_bytes(dictlist)
+        csr_size = csrgraph_from_dictlist(dictlist).size_in_bytes()
+        compressed_size = compressedgraph.size_in_bytes()
+        print "{0:<55} : {1} ({2:.1f} per edge)".format("bytes, Graph", dict_size, float(dict_size) / no_edges)
+        print "{0:<55} : {1} ({2:.1f} per edge)".format("bytes, CSRGraph", csr_size, float(csr_size) / no_edges)
+        print "{0:<55} : {1} ({2:.1f} per edge)".format("bytes, CompressedGraph", compressed_size, float(compressed_size) / no_edges)
+        # memory only for the sparse graph, which the DFS takes minutes on
+        for algo in (algos if test in tests else []):
+            algocode = locals()[algo]
+            for (name, graph) in [("Graph", dictgraph), ("CompressedGraph", compressedgraph)]:
+                arg = [0] if algo == "dfs_sm_any_cormen_extended" else 0
+                if algo == "strongly_connected_components_optimised":
+                    time = Timer(lambda: algocode(graph)).timeit(number=3)
+                else:
+                    time = Timer(lambda: algocode(graph, arg)).timeit(number=3)
+                print "{0:<55} : {1}".format(algo + ", " + name, time)
+                gc.collect()
+        print ""
+
+
+
+    print "\n*** Attaching a 'SharedGraph' vs pickling a dict graph: ***\n"
+
+    from cPickle import dumps, loads, HIGHEST_PROTOCOL
+
+    for test in tests:
+        print test
+        dictlist = random_dictlist_graph(*test)
+        time = Timer(lambda: loads(dumps(dictlist, HIGHEST_PROTOCOL))).timeit(number=3)
+        print "{0:<55} : {1}".format("pickle and unpickle dict", time)
+        gc.collect()
+        shared = share_graph(csrgraph_from_dictlist(dictlist))
+        time = Timer(lambda: attach_graph(shared.name()).release()).timeit(number=3)
+        print "{0:<55} : {1}".format("attach and release SharedGraph", time)
+        gc.collect()
+        time = Timer(lambda: bfs_sm_shortest_cormen(shared, 0)).timeit(number=3)
+        print "{0:<55} : {1}".format("bfs_sm_shortest_cormen, SharedGraph", time)
+        shared.release()
+        shared.unlink()
+        gc.collect()
+        print ""
+
+
+
+    print "\n*** Rebuilding a graph vs loading it from a file: ***\n"
+
+    from random_graph_generation import random_listlist_graph_sample_lazy as random_listlist_graph
+
+    path = os.path.join(tempfile.gettempdir(), 'csrgraph-{0}'.format(uuid4().hex))
+
+    for test in tests:
+        print test
+        time = Timer(lambda: Graph(random_dictlist_graph(*test))).timeit(number=3)
+        print "{0:<55} : {1}".format("random_dictlist_graph", time)
+        gc.collect()
+        time = Timer(lambda: write_graph(random_dictlist_graph(*test), path)).timeit(number=3)
+        print "{0:<55} : {1}".format("random_dictlist_graph and write_graph", time)
+        gc.collect()
+        time = Timer(lambda: write_graph(random_listlist_graph(*test), path)).timeit(number=3)
+        print "{0:<55} : {1}".format("random_listlist_graph and write_graph", time)
+        gc.collect()
+        time = Timer(lambda: load_graph(path).release()).timeit(number=3)
+        print "{0:<55} : {1}".format("load_graph", time)
+        gc.collect()
+        graph = load_graph(path)
+        time = Timer(lambda: bfs_sm_shortest_cormen(graph, 0)).timeit(number=3)
+        print "{0:<55} : {1}".format("bfs_sm_shortest_cormen, FileGraph", time)
+        graph.release()
+        gc.collect()
+        print ""
+
+
+
+    print "\n*** Building a graph from an edge list file: ***\n"
+
+    from timeit import default_timer as timer
+
+    edgelist = os.path.join(tempfile.gettempdir(), 'edgelist-{0}'.format(uuid4().hex))
+
+    for test in tests:
+        print test
+        dictlist = random_dictlist_graph(*test)
+        dict_size = dictlist_size_in_bytes(dictlist)
+        print "{0:<55} : {1}".format("bytes, Graph", dict_size)
+        for binary in [False, True]:
+            kind = "binary" if binary else "text"
+            write_edgelist(Graph(dictlist), edgelist, binary)
+            started = timer()
+            graph, peak = csrgraph_from_edgelist(edgelist, binary)
+            time = timer() - started
+            print "{0:<55} : {1} (peak bytes {2})".format("csrgraph_from_edgelist, " + kind, time, peak)
+            del graph
+            gc.collect()
+            started = timer()
+            graph, peak = csrgraph_from_edgelist(edgelist, binary, path)
+            time = timer() - started
+            print "{0:<55} : {1} (peak bytes {2})".format("csrgraph_from_edgelist, " + kind + ", to file", time, peak)
+            graph.release()
+            gc.collect()
+        print ""
+
+    os.unlink(edgelist)
+    os.unlink(path)
@@ -0,0 +1,210 @@
+import csv
+import json
+from timeit import default_timer as timer
+
+
+# ********
+#
+# instrumentation for traversals
+#  - counters and phase timings, filled in by the functions taking a 'stats'
+#    argument (or by wrapping the graph) and exported for dashboards
+#
+# ********
+
+#
+# counters:
+#  - nodes_discovered: nodes reached by the traversal
+#  - edges_examined:   adjacent nodes looked at, counted per node as its degree
+#  - max_frontier:     largest the stack (DFS) or rim (BFS) got
+#  - neighbour_calls:  calls to 'neighbours' (only counted by 'InstrumentedGraph')
+#
+# notes:
+#  - traversals update it once per node, not once per edge, and only when given
+#    one, so leaving it out costs a single 'is None' test per node
+#  - phases are timed as 'with stats.phase(name)', or 'with phase(stats, name)' when
+#    'stats' may be None; a phase entered again adds to its time
+#
+class TraversalStats:
+
+    def __init__(self, name=None):
+        self.name = name
+        self.nodes_discovered = 0
+        self.edges_examined = 0
+        self.max_frontier = 0
+        self.neighbour_calls = 0
+        self._phases = []       # phase names, in the order first entered
+        self._seconds = dict()  # phase name -> total time spent in it
+
+    # called as a node is discovered, with its degree and the frontier size at that point
+    def discover(self, no_adjacents, frontier):
+        self.nodes_discovered += 1
+        self.edges_examined += no_adjacents
+        if frontier > self.max_frontier: self.max_frontier = frontier
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def _add_phase_time(self, name, seconds):
+        if not name in self._seconds:
+            self._phases.append(name)
+            self._seconds[name] = 0.0
+        self._seconds[name] += seconds
+
+    # (name, seconds) for every phase, in the order first entered
+    def phases(self):
+        return [ (name, self._seconds[name]) for name in self._phases ]
+
+    def as_dict(self):
+        return {    'name':             self.name,
+                    'nodes_discovered': self.nodes_discovered,
+                    'edges_examined':   self.edges_examined,
+                    'max_frontier':     self.max_frontier,
+                    'neighbour_calls':  self.neighbour_calls,
+                    'phases':           dict(self._seconds)     }
+
+    def to_json(self):
+        return json.dumps(self.as_dict(), sort_keys=True)
+
+    # as 'as_dict', with a 'seconds_<phase>' column per phase instead of 'phases'
+    def as_row(self):
+        row = self.as_dict()
+        del row['phases']
+        for (name, seconds) in self.phases():
+            row['seconds_' + name.replace(' ', '_')] = seconds
+        return row
+
+
+class _Phase:
+
+    def __init__(self, stats, name):
+        self._stats = stats
+        self._name = name
+
+    def __enter__(self):
+        self._started = timer()
+        return self._stats
+
+    def __exit__(self, *exc_info):
+        self._stats._add_phase_time(self._name, timer() - self._started)
+        return False
+
+
+class _NoPhase:
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NO_PHASE = _NoPhase()
+
+
+#
+# 'stats.phase(name)', or a context doing nothing if 'stats' is None
+#
+def phase(stats, name):
+    return _NO_PHASE if stats is None else stats.phase(name)
+
+
+#
+# input:
+#  - stats: list of 'TraversalStats'
+#  - path:  file to write them to, a row each (see 'as_row')
+#
+def write_csv(stats, path):
+    rows = [ entry.as_row() for entry in stats ]
+    fields = [ 'name', 'nodes_discovered', 'edges_examined', 'max_frontier', 'neighbour_calls' ]
+    for row in rows:
+        fields.extend(sorted(key for key in row if not key in fields))
+    with open(path, 'wb') as fileobj:
+        writer = csv.DictWriter(fileobj, fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+
+
+
+# ********
+#
+# instrumented graph
+#  - counts the work of any algorithm using the 'Graph' interface, including
+#    the ones without a 'stats' argument
+#
+# ********
+
+#
+# input:
+#  - graph: anything with the 'Graph' interface
+#  - stats: 'TraversalStats' to count into
+#
+# notes:
+#  - counts 'neighbours' calls, and the adjacent nodes they return as examined
+#    edges; not to be combined with a 'stats' argument on the same traversal, which
+#    would count the edges twice
+#  - adds a method call per 'neighbours' call, so is not free
+#
+class InstrumentedGraph:
+
+    def __init__(self, graph, stats):
+        self._graph = graph
+        self._stats = stats
+
+    def nodes(self):
+        return self._graph.nodes()
+
+    def has_node(self, node):
+        return self._graph.has_node(node)
+
+    def neighbours(self, node):
+        adjacents = self._graph.neighbours(node)
+        self._stats.neighbour_calls += 1
+        self._stats.edges_examined += len(adjacents)
+        return adjacents
+
+
+
+
+
+# ********
+#
+# performance tests
+#
+# ********
+
+if __name__ == '__main__':
+
+    from random_graph_generation import random_dictlist_graph_sample_split_set_optimised as random_dictlist_graph
+    from elementary_graph_algorithms import Graph, bfs_sm_shortest_cormen, strongly_connected_components, strongly_connected_components_pearce
+
+    from timeit import Timer
+    import gc
+
+    print "\n*** Tests for the cost of instrumentation: ***\n"
+
+    tests = [   (2000,30000), (10000,1000000)   ]
+    algos = [   "bfs_sm_shortest_cormen",
+                "strongly_connected_components",
+                "strongly_connected_components_pearce"  ]
+
+    for test in tests:
+        print test
+        graph = Graph(random_dictlist_graph(*test))
+        arguments = { "bfs_sm_shortest_cormen": (graph, 0) }
+        for algo in algos:
+            algocode = locals()[algo]
+            args = arguments.get(algo, (graph,))
+            time = Timer(lambda: algocode(*args)).timeit(number=3)
+            print "{0:<55} : {1}".format(algo + ", off", time)
+            gc.collect()
+            time = Timer(lambda: algocode(*args, stats=TraversalStats(algo))).timeit(number=3)
+            print "{0:<55} : {1}".format(algo + ", on", time)
+            gc.collect()
+            time = Timer(lambda: algocode(InstrumentedGraph(args[0], TraversalStats(algo)), *args[1:])).timeit(number=3)
+            print "{0:<55} : {1}".format(algo + ", on 'InstrumentedGraph'", time)
+            gc.collect()
+            stats = TraversalStats(algo)
+            algocode(*args, stats=stats)
+            print stats.to_json()
+        print ""
@@ -0,0 +1,149 @@
+from array import array
+from multiprocessing import Pool
+
+from graph_representations import share_graph, attach_graph
+
+
+# ********
+#
+# multi-source BFS over a process pool
+#  - the graph is published once in shared memory (see 'share_graph') and attached
+#    to by the workers, instead of being pickled for every task
+#
+# ********
+
+# the graph as seen by a worker, set by '_init_worker'
+_graph = None
+
+def _init_worker(name):
+    global _graph
+    _graph = attach_graph(name)
+
+
+#
+# input:
+#  - graph:    directed, may be cyclic (CSR or shared representation)
+#  - source:   root node to search from
+#
+# output:
+#  - distance: shortest distance to 'source' for every node (as array, -1 if unreached)
+#
+# notes:
+#  - performs a breath-first search, one level at a time
+#  - 'distance' replaces both 'greyed' and 'parent' of 'bfs_sm_shortest_cormen'
+#
+def bfs_sm_distances(graph, source):
+    distance = array('i', [-1]) * graph.no_nodes()
+    distance[source] = 0
+    level = 0
+    rim = [source]
+    while rim:
+        level += 1
+        next_rim = []
+        for node in rim:
+            for adjacent in graph.neighbours(node):
+                # skip if already discovered
+                if distance[adjacent] >= 0: continue
+                distance[adjacent] = level
+                next_rim.append(adjacent)
+        rim = next_rim
+    return distance
+
+
+# runs in a worker: rows are sent back as raw bytes, which pickle compactly
+def _bfs_rows(sources):
+    return [ (source, bfs_sm_distances(_graph, source).tostring()) for source in sources ]
+
+
+#
+# input:
+#  - graph:     directed, may be cyclic (anything with the 'Graph' interface, nodes 0..n-1)
+#  - sources:   root nodes to search from
+#  - processes: number of worker processes (number of CPUs if not given)
+#  - chunksize: number of sources per task
+#
+# output:
+#  - rows:      (source, distance) for every source, in order, yielded as soon as
+#               they are ready; 'distance' as returned by 'bfs_sm_distances'
+#
+# notes:
+#  - workers attach to the shared graph by name, so they use it in place; only
+#    sources go to the workers and only rows come back
+#  - workers never release the graph: their mappings go when the pool is terminated
+#  - closing the generator early stops the workers
+#
+def bfs_ms_distance_rows(graph, sources, processes=None, chunksize=16):
+    sources = list(sources)
+    chunks = [ sources[i:i+chunksize] for i in xrange(0, len(sources), chunksize) ]
+    shared = share_graph(graph)
+    try:
+        pool = Pool(processes, _init_worker, (shared.name(),))
+        try:
+            for rows in pool.imap(_bfs_rows, chunks):
+                for (source, row) in rows:
+                    distance = array('i')
+                    distance.fromstring(row)
+                    yield source, distance
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+    finally:
+        shared.release()
+        shared.unlink()
+
+
+#
+# as above, but collected in a single array
+#
+# output:
+#  - matrix: distances, row by row: the distance from sources[i] to node j is
+#            matrix[i * n + j] (-1 if unreached)
+#
+def bfs_ms_distance_matrix(graph, sources, processes=None, chunksize=16):
+    matrix = array('i')
+    for (source, distance) in bfs_ms_distance_rows(graph, sources, processes, chunksize):
+        matrix.extend(distance)
+    return matrix
+
+
+
+
+
+# ********
+#
+# performance tests
+#
+# ********
+
+if __name__ == '__main__':
+
+    from random_graph_generation import random_dictlist_graph_sample_split_set_optimised as random_dictlist_graph
+    from graph_representations import csrgraph_from_dictlist
+    from elementary_graph_algorithms import Graph, bfs_sm_shortest_cormen
+
+    from multiprocessing import cpu_count
+    from timeit import Timer
+    import gc
+
+    print "\n*** Tests for multi-source BFS, serial vs {0} processes: ***\n".format(cpu_count())
+
+    tests = [   (2000,30000), (2000,1000000), (20000,3500000)   ]
+    no_sources = 64
+
+    for test in tests:
+        print test
+        dictlist = random_dictlist_graph(*test)
+        dictgraph = Graph(dictlist)
+        csrgraph = csrgraph_from_dictlist(dictlist)
+        sources = range(no_sources)
+        time = Timer(lambda: [ bfs_sm_shortest_cormen(dictgraph, source) for source in sources ]).timeit(number=1)
+        print "{0:<55} : {1}".format("bfs_sm_shortest_cormen, in a loop", time)
+        gc.collect()
+        time = Timer(lambda: [ bfs_sm_distances(csrgraph, source) for source in sources ]).timeit(number=1)
+        print "{0:<55} : {1}".format("bfs_sm_distances, in a loop", time)
+        gc.collect()
+        time = Timer(lambda: bfs_ms_distance_matrix(csrgraph, sources)).timeit(number=1)
+        print "{0:<55} : {1}".format("bfs_ms_distance_matrix", time)
+        gc.collect()
+        print ""
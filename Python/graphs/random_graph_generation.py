@@ -2,6 +2,9 @@
 
 import random
 import itertools
+import math
+
+from graph_representations import csrgraph_from_listlist
 
 
 # ********
@@ -85,6 +88,69 @@ def random_listlist_graph_sample_lazy(no_nodes, no_edges):
 
 
 
+# ********
+#
+# methods from generating directed, unconnected, cyclic (single) graph
+#  - every edge present with probability p, independently (Erdos-Renyi G(n,p))
+#  - number of edges only known in expectation: p*n**2
+#
+# ********
+
+#
+# from Batagelj and Brandes, "Efficient generation of large random networks"
+#
+# input:
+#  - no_nodes:    number of nodes n
+#  - probability: probability p of every edge, self-loops included
+#
+# output:
+#  - edges:       (node_from, node_to) pairs, yielded lazily and sorted
+#
+# notes:
+#  - instead of a coin flip per possible edge, the number of edges skipped before
+#    the next one is drawn directly: it is geometric, so log(1-r) / log(1-p) for a
+#    uniform r in [0,1)
+#  - expected O(p*n**2) time and O(1) memory, against O(n**2) for sampling edge ids
+#  - log1p keeps log(1-p) exact for tiny p, where 1.0-p would round to 1.0 and
+#    leave nothing to divide by
+#
+def random_edges_gnp(no_nodes, probability):
+    max_no_edges = no_nodes**2
+    if probability <= 0: return
+    if probability >= 1:
+        for edge in xrange(max_no_edges):
+            yield divmod(edge, no_nodes)
+        return
+    log_q = math.log1p(-probability)
+    random_random = random.random
+    edge = -1
+    while True:
+        edge += 1 + int(math.log1p(-random_random()) / log_q)
+        if edge >= max_no_edges: return
+        yield divmod(edge, no_nodes)
+
+def random_listlist_graph_gnp(no_nodes, probability):
+    nodes = range(no_nodes)
+    edges = list(random_edges_gnp(no_nodes, probability))
+    return (nodes,edges)
+
+def random_listlist_graph_gnp_lazy(no_nodes, probability):
+    nodes = xrange(no_nodes)
+    edges = random_edges_gnp(no_nodes, probability)
+    return (nodes,edges)
+
+def random_dictlist_graph_gnp(no_nodes, probability):
+    graph = {}
+    for node in xrange(no_nodes):
+        graph[node] = []
+    for (node_from, node_to) in random_edges_gnp(no_nodes, probability):
+        graph[node_from].append(node_to)
+    return graph
+
+
+
+
+
 # ********
 #
 # methods from generating directed, unconnected, cyclic (single) graph
@@ -280,6 +346,193 @@ def random_dictlist_graph_sample_split_sorted_alt(no_nodes, no_edges, weight=0.6
 
 
 
+# ********
+#
+# methods from generating directed, unconnected, cyclic (single) graph
+#  - skewed degrees, as in real-world graphs, unlike the uniform methods above
+#  - seeded: the same seed gives the same graph
+#  - nodes as dictionary and edges as adjacency list, or in CSR representation
+#
+# ********
+
+# R-MAT graphs with more than this fraction of the n**2 possible edges are refused
+RMAT_DENSITY = 0.1
+
+# draws allowed per edge before the R-MAT parameters are taken to be too skewed
+RMAT_ATTEMPTS = 100
+
+#
+# from Chakrabarti, Zhan, and Faloutsos, "R-MAT: A recursive model for graph mining"
+#
+# input:
+#  - no_nodes:  number of nodes n
+#  - no_edges:  number of (distinct) edges
+#  - a, b, c:   probabilities of recursing into the top-left, top-right, and
+#               bottom-left quarter of the adjacency matrix (bottom-right gets the rest)
+#  - seed:      for the random number generator
+#
+# output:
+#  - edges:     (node_from, node_to) pairs, yielded lazily
+#
+# notes:
+#  - an edge picks a quarter of the matrix at every level, so for n = 2**k it takes k
+#    draws; for other n the matrix is rounded up and edges outside it are dropped
+#  - a > b, c > d puts the hubs at the low numbered nodes
+#  - duplicates are dropped, so it slows down as the graph gets dense: meant for
+#    sparse graphs, and more than RMAT_DENSITY of the n**2 possible edges are refused
+#  - gives up after RMAT_ATTEMPTS draws per edge, for a, b, c so skewed that the
+#    edges keep landing on the same few cells (with a = 1 there is only one)
+#
+def _rmat_edges(no_nodes, no_edges, a, b, c, seed):
+    if min(a, b, c) < 0 or a + b + c > 1:
+        raise ValueError("Probabilities a, b, c must be non-negative and sum to at most 1")
+    if no_edges > RMAT_DENSITY * no_nodes**2:
+        raise ValueError("R-MAT graphs are limited to {0} of all edges, {1} asked for".format(RMAT_DENSITY, float(no_edges) / no_nodes**2))
+    random_random = random.Random(seed).random
+    ab = a + b
+    abc = a + b + c
+    levels = max(1, (no_nodes - 1).bit_length())
+    edges = set()
+    attempts = RMAT_ATTEMPTS * no_edges
+    while len(edges) < no_edges:
+        attempts -= 1
+        if attempts < 0:
+            raise ValueError("Only {0} distinct edges found for a, b, c = {1}, {2}, {3}".format(len(edges), a, b, c))
+        node_from = node_to = 0
+        for level in xrange(levels):
+            r = random_random()
+            node_from <<= 1
+            node_to <<= 1
+            if r < a: continue
+            elif r < ab: node_to |= 1
+            elif r < abc: node_from |= 1
+            else:
+                node_from |= 1
+                node_to |= 1
+        if node_from >= no_nodes or node_to >= no_nodes: continue
+        edge = node_from*no_nodes + node_to
+        if edge in edges: continue
+        edges.add(edge)
+        yield (node_from, node_to)
+
+def random_dictlist_graph_rmat(no_nodes, no_edges, a=0.57, b=0.19, c=0.19, seed=None):
+    graph = {}
+    for node in xrange(no_nodes):
+        graph[node] = []
+    for (node_from, node_to) in _rmat_edges(no_nodes, no_edges, a, b, c, seed):
+        graph[node_from].append(node_to)
+    return graph
+
+def random_csr_graph_rmat(no_nodes, no_edges, a=0.57, b=0.19, c=0.19, seed=None):
+    return csrgraph_from_listlist(xrange(no_nodes), _rmat_edges(no_nodes, no_edges, a, b, c, seed))
+
+
+#
+# from Barabasi and Albert, "Emergence of scaling in random networks"
+#
+# input:
+#  - no_nodes:   number of nodes n
+#  - out_degree: number of edges added with every node
+#  - seed:       for the random number generator
+#
+# output:
+#  - edges:      (node_from, node_to) pairs, yielded lazily
+#
+# notes:
+#  - nodes are added one at a time, each attached to 'out_degree' distinct earlier
+#    nodes chosen with probability proportional to their degree + 1
+#  - 'ends' holds every node once, plus once for every edge it is on, so a uniform
+#    choice from it is a choice by degree + 1
+#  - every edge is given a random direction: always pointing to the earlier node
+#    would make the graph acyclic
+#  - about n * out_degree edges, none duplicated
+#
+def _barabasi_albert_edges(no_nodes, out_degree, seed):
+    generator = random.Random(seed)
+    random_choice = generator.choice
+    random_random = generator.random
+    ends = []
+    for node in xrange(no_nodes):
+        adjacents = set()
+        while len(adjacents) < min(out_degree, node):
+            adjacents.add(random_choice(ends))
+        ends.append(node)
+        for adjacent in adjacents:
+            ends.append(node)
+            ends.append(adjacent)
+            if random_random() < 0.5:
+                yield (node, adjacent)
+            else:
+                yield (adjacent, node)
+
+def random_dictlist_graph_barabasi_albert(no_nodes, out_degree, seed=None):
+    graph = {}
+    for node in xrange(no_nodes):
+        graph[node] = []
+    for (node_from, node_to) in _barabasi_albert_edges(no_nodes, out_degree, seed):
+        graph[node_from].append(node_to)
+    return graph
+
+def random_csr_graph_barabasi_albert(no_nodes, out_degree, seed=None):
+    return csrgraph_from_listlist(xrange(no_nodes), _barabasi_albert_edges(no_nodes, out_degree, seed))
+
+
+
+
+
+# ********
+#
+# methods from generating directed, unconnected, cyclic (single) weighted graph
+#  - the graphs of the methods above, with a random weight on every edge
+#  - nodes as dictionary and edges as adjacency list of (adjacent node, weight)
+#    pairs (see 'WeightedGraph')
+#
+# ********
+
+#
+# input:
+#  - graph:      dict+list representation
+#  - max_weight: largest weight
+#  - seed:       for the random number generator
+#
+# output:
+#  - graph:      same edges, each with an integer weight drawn uniformly from
+#                1..max_weight
+#
+def random_weights(graph, max_weight=100, seed=None):
+    random_random = random.Random(seed).random
+    weighted = {}
+    for (node, adjacents) in graph.iteritems():
+        weighted[node] = [ (adjacent, int(random_random() * max_weight) + 1) for adjacent in adjacents ]
+    return weighted
+
+# a seed for the weights that differs from 'seed', which the graph itself is drawn with
+def _weights_seed(seed):
+    return None if seed is None else random.Random(seed).getrandbits(64)
+
+# as 'random_dictlist_graph_sample', but with its own generator so the graph is seeded too
+def random_weighted_graph_sample(no_nodes, no_edges, max_weight=100, seed=None):
+    max_no_edges = no_nodes**2
+    no_edges = min(no_edges, max_no_edges)
+    encoded_edges = random.Random(seed).sample(xrange(max_no_edges), no_edges)
+    graph = {}
+    for node in xrange(no_nodes):
+        graph[node] = []
+    for edge in encoded_edges:
+        (node_from, node_to) = divmod(edge, no_nodes)
+        graph[node_from].append(node_to)
+    return random_weights(graph, max_weight, _weights_seed(seed))
+
+def random_weighted_graph_rmat(no_nodes, no_edges, max_weight=100, seed=None):
+    return random_weights(random_dictlist_graph_rmat(no_nodes, no_edges, seed=seed), max_weight, _weights_seed(seed))
+
+def random_weighted_graph_barabasi_albert(no_nodes, out_degree, max_weight=100, seed=None):
+    return random_weights(random_dictlist_graph_barabasi_albert(no_nodes, out_degree, seed=seed), max_weight, _weights_seed(seed))
+
+
+
+
+
 # ********
 #
 # performance tests
@@ -333,3 +586,65 @@ if __name__ == '__main__':
             print "{0:<55} : {1}".format(algo, time)
             gc.collect()
             print ""
+
+
+    print "\n*** Tests for 'gnp' vs 'sample' methods, same expected number of edges: ***\n"
+
+    from graph_representations import csrgraph_from_sorted_edges
+
+    tests = [   (200,3000), (2000,30000), (2000,1000000), (100000,1000000)  ]
+    algos = [   "random_dictlist_graph_sample",
+                "random_dictlist_graph_gnp"     ]
+
+    for test in tests:
+        print test
+        (no_nodes, no_edges) = test
+        probability = float(no_edges) / no_nodes**2
+        for algo in algos:
+            algocode = locals()[algo]
+            argument = probability if algo.endswith("_gnp") else no_edges
+            time = Timer(lambda: algocode(no_nodes, argument)).timeit(number=3)
+            print "{0:<55} : {1}".format(algo, time)
+            gc.collect()
+            print ""
+
+    print "\n*** Tests for 'gnp' streamed into CSR, large sparse graphs: ***\n"
+
+    tests = [   (1000000,3000000), (10000000,10000000)  ]
+
+    for test in tests:
+        print test
+        (no_nodes, no_edges) = test
+        probability = float(no_edges) / no_nodes**2
+        time = Timer(lambda: csrgraph_from_sorted_edges(*random_listlist_graph_gnp_lazy(no_nodes, probability))).timeit(number=1)
+        print "{0:<55} : {1}".format("csrgraph_from_sorted_edges(random_listlist_graph_gnp_lazy)", time)
+        gc.collect()
+        print ""
+
+
+
+    print "\n*** Tests for skewed methods, vs uniform: ***\n"
+
+    tests = [   (2000,30000), (10000,1000000), (100000,1000000)   ]
+    algos = [   "random_dictlist_graph_sample_split_set_optimised",
+                "random_dictlist_graph_rmat",
+                "random_csr_graph_rmat",
+                "random_dictlist_graph_barabasi_albert",
+                "random_csr_graph_barabasi_albert"      ]
+
+    for test in tests:
+        print test
+        (no_nodes, no_edges) = test
+        for algo in algos:
+            algocode = locals()[algo]
+            # Barabasi-Albert takes the number of edges per node
+            argument = no_edges // no_nodes if algo.endswith("_barabasi_albert") else no_edges
+            time = Timer(lambda: algocode(no_nodes, argument)).timeit(number=1)
+            print "{0:<55} : {1}".format(algo, time)
+            gc.collect()
+            if algo.startswith("random_dictlist"):
+                graph = algocode(no_nodes, argument)
+                print "{0:<55} : {1}".format("  max out-degree", max(len(adjacents) for adjacents in graph.itervalues()))
+                del graph
+                gc.collect()
+            print ""
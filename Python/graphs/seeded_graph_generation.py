@@ -0,0 +1,303 @@
+from array import array
+from hashlib import sha1
+from multiprocessing import Pool
+import itertools
+import os
+import random
+import tempfile
+
+from graph_representations import CSRGraph, write_graph, load_graph
+from random_graph_generation import random_csr_graph_rmat, random_csr_graph_barabasi_albert
+
+
+# ********
+#
+# reproducible random graphs
+#  - every graph is fixed by its generator, size, and seed, whichever process
+#    makes it and however many processes there are
+#
+# ********
+
+#
+# input:
+#  - generator:  random.Random to draw from
+#  - population: number of items N
+#  - successes:  number of marked items K
+#  - draws:      number of items drawn without replacement
+#
+# output:
+#  - marked:     number of marked items drawn (hypergeometric)
+#
+# notes:
+#  - by inversion, visiting outcomes from the mode outwards: probabilities are
+#    only known up to a factor, from the ratio of neighbouring ones, so they are
+#    summed first and then walked again
+#  - stops once the next outcomes add less than the precision of the sum, so takes
+#    O(standard deviation) steps, about sqrt(draws)
+#
+def _hypergeometric(generator, population, successes, draws):
+    low = max(0, draws - (population - successes))
+    high = min(draws, successes)
+    if low == high: return low
+    failures = population - successes
+    mode = int((draws + 1.0) * (successes + 1.0) / (population + 2.0))
+    mode = min(max(mode, low), high)
+    outcomes = [mode]
+    weights = [1.0]
+    total = 1.0
+    (up, up_weight) = (mode, 1.0)
+    (down, down_weight) = (mode, 1.0)
+    while (up < high and up_weight > total * 1e-17) or (down > low and down_weight > total * 1e-17):
+        if up < high:
+            up_weight *= float(successes - up) * (draws - up) / ((up + 1.0) * (failures - draws + up + 1))
+            up += 1
+            outcomes.append(up)
+            weights.append(up_weight)
+            total += up_weight
+        if down > low:
+            down_weight *= float(down) * (failures - draws + down) / ((successes - down + 1.0) * (draws - down + 1))
+            down -= 1
+            outcomes.append(down)
+            weights.append(down_weight)
+            total += down_weight
+    u = generator.random() * total
+    for (outcome, weight) in zip(outcomes, weights):
+        u -= weight
+        if u < 0: return outcome
+    return mode
+
+
+#
+# input:
+#  - task:    (n, first, last, number of edges, seed) for nodes first..last-1
+#
+# output:
+#  - degrees: out-degree of every node in the chunk (as bytes of array('l'))
+#  - targets: adjacent nodes, node by node and sorted (as bytes of array('i'))
+#
+# notes:
+#  - runs in a worker; edges are sampled from the chunk's own edge ids with its
+#    own generator, so it does not matter where or when it runs
+#
+def _uniform_chunk(task):
+    (no_nodes, first, last, no_edges, seed) = task
+    encoded_edges = random.Random(seed).sample(xrange(first*no_nodes, last*no_nodes), no_edges)
+    encoded_edges.sort()
+    degrees = array('l', [0]) * (last - first)
+    targets = array('i')
+    for edge in encoded_edges:
+        (node_from, node_to) = divmod(edge, no_nodes)
+        degrees[node_from - first] += 1
+        targets.append(node_to)
+    return (degrees.tostring(), targets.tostring())
+
+
+#
+# input:
+#  - no_nodes:  number of nodes n
+#  - no_edges:  number of (distinct) edges
+#  - seed:      for the random number generators
+#  - processes: number of worker processes (number of CPUs if not given, no pool if 1)
+#  - chunksize: number of nodes per chunk
+#
+# output:
+#  - graph:     uniformly random graph, as 'random_dictlist_graph_sample', in CSR
+#               representation with adjacent nodes sorted
+#
+# notes:
+#  - the nodes are cut into chunks, and the number of edges in every chunk drawn
+#    one chunk at a time from what is left (multivariate hypergeometric), as if the
+#    edges had been sampled all at once
+#  - every chunk also gets its own seed, drawn in the same sequence, so chunks are
+#    independent streams and can be sampled in any process
+#  - the graph depends on 'seed' and 'chunksize' only, not on 'processes'
+#
+def random_csr_graph_uniform(no_nodes, no_edges, seed=None, processes=None, chunksize=4096):
+    if seed is None: seed = random.getrandbits(64)
+    no_edges = min(no_edges, no_nodes**2)
+    generator = random.Random(seed)
+    tasks = []
+    remaining_population = no_nodes**2
+    remaining_edges = no_edges
+    for first in xrange(0, no_nodes, chunksize):
+        last = min(first + chunksize, no_nodes)
+        population = (last - first) * no_nodes
+        chunk_edges = _hypergeometric(generator, remaining_population, population, remaining_edges)
+        tasks.append((no_nodes, first, last, chunk_edges, generator.getrandbits(64)))
+        remaining_population -= population
+        remaining_edges -= chunk_edges
+    offsets = array('l', [0])
+    targets = array('i')
+    degrees = array('l')
+    pool = Pool(processes) if processes != 1 else None
+    try:
+        chunks = pool.imap(_uniform_chunk, tasks) if pool else itertools.imap(_uniform_chunk, tasks)
+        for (chunk_degrees, chunk_targets) in chunks:
+            del degrees[:]
+            degrees.fromstring(chunk_degrees)
+            for degree in degrees:
+                offsets.append(offsets[-1] + degree)
+            targets.fromstring(chunk_targets)
+        if pool: pool.close()
+    finally:
+        if pool:
+            pool.terminate()
+            pool.join()
+    return CSRGraph(offsets, targets)
+
+
+
+
+
+# ********
+#
+# graph cache
+#  - generated graphs kept on disk under a name derived from what made them, and
+#    mapped back in instead of generated again
+#
+# ********
+
+#
+# input:
+#  - no_nodes: number of nodes n
+#
+# output:
+#  - graph:    the path 0 -> 1 -> ... -> n-1, in CSR representation
+#
+# notes:
+#  - as deep as a graph gets, for the worst case of DFS (no randomness involved)
+#
+def path_csr_graph(no_nodes):
+    offsets = array('l', xrange(no_nodes))
+    offsets.append(max(0, no_nodes - 1))
+    targets = array('i', xrange(1, no_nodes))
+    return CSRGraph(offsets, targets)
+
+
+# generators, each with the settings its graphs depend on besides (n, m, seed),
+# which are passed in after the seed and go into the cache key
+_GENERATORS = {
+    'uniform':          (lambda no_nodes, no_edges, seed, chunksize: random_csr_graph_uniform(no_nodes, no_edges, seed, chunksize=chunksize),
+                         (4096,)),
+    'rmat':             (lambda no_nodes, no_edges, seed, a, b, c: random_csr_graph_rmat(no_nodes, no_edges, a, b, c, seed),
+                         (0.57, 0.19, 0.19)),
+    'barabasi_albert':  (lambda no_nodes, no_edges, seed: random_csr_graph_barabasi_albert(no_nodes, no_edges, seed=seed),
+                         ()),
+    'path':             (lambda no_nodes, no_edges, seed: path_csr_graph(no_nodes),
+                         ()),
+}
+
+# part of the cache key: to be increased whenever a generator changes the graphs it
+# makes for the same arguments, so that no cache file from before is used again
+_CACHE_VERSION = 1
+
+_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'csrgraph-cache')
+
+
+#
+# input:
+#  - generator: name of the generator: 'uniform', 'rmat', 'barabasi_albert', or 'path'
+#  - no_nodes:  number of nodes n
+#  - no_edges:  number of edges ('barabasi_albert': number of edges per node,
+#               'path': ignored, always n-1)
+#  - seed:      for the random number generators (required: an unseeded graph
+#               could not be found again)
+#  - cache_dir: directory holding the cache (created if missing)
+#
+# output:
+#  - graph:     the graph, mapped from its cache file (see 'load_graph')
+#
+# notes:
+#  - the cache file is named by the sha1 of the cache version, the generator with
+#    its settings, n, m, and seed, so the same call always finds the same file, and
+#    different calls never share one
+#  - written to a temporary file first and then renamed, so an interrupted run
+#    never leaves a partial graph behind for the next one to load
+#
+def generate_graph(generator, no_nodes, no_edges, seed, cache_dir=None):
+    if cache_dir is None: cache_dir = _CACHE_DIR
+    path = cached_graph_path(generator, no_nodes, no_edges, seed, cache_dir)
+    if not os.path.exists(path):
+        if not os.path.isdir(cache_dir): os.makedirs(cache_dir)
+        (function, settings) = _GENERATORS[generator]
+        graph = function(no_nodes, no_edges, seed, *settings)
+        (fd, temporary) = tempfile.mkstemp(dir=cache_dir)
+        os.close(fd)
+        try:
+            write_graph(graph, temporary)
+            os.rename(temporary, path)
+        except:
+            os.unlink(temporary)
+            raise
+    return load_graph(path)
+
+
+def cached_graph_path(generator, no_nodes, no_edges, seed, cache_dir=None):
+    if not generator in _GENERATORS: raise ValueError("Unknown generator '{0}'".format(generator))
+    if seed is None: raise ValueError("Cached graphs need a seed")
+    if cache_dir is None: cache_dir = _CACHE_DIR
+    settings = _GENERATORS[generator][1]
+    key = sha1(repr((_CACHE_VERSION, generator, settings, no_nodes, no_edges, seed))).hexdigest()
+    return os.path.join(cache_dir, key + '.csrgraph')
+
+
+
+
+
+# ********
+#
+# performance tests
+#
+# ********
+
+if __name__ == '__main__':
+
+    from random_graph_generation import random_dictlist_graph_sample_split_set_optimised as random_dictlist_graph
+
+    from multiprocessing import cpu_count
+    from timeit import Timer
+    import shutil
+    import gc
+
+    print "\n*** Tests for 'random_csr_graph_uniform', serial vs {0} processes: ***\n".format(cpu_count())
+
+    tests = [   (2000,30000), (2000,1000000), (100000,3000000)  ]
+
+    for test in tests:
+        print test
+        time = Timer(lambda: random_dictlist_graph(*test)).timeit(number=1)
+        print "{0:<55} : {1}".format("random_dictlist_graph_sample_split_set_optimised", time)
+        gc.collect()
+        time = Timer(lambda: random_csr_graph_uniform(*test, seed=1, processes=1)).timeit(number=1)
+        print "{0:<55} : {1}".format("random_csr_graph_uniform, serial", time)
+        gc.collect()
+        time = Timer(lambda: random_csr_graph_uniform(*test, seed=1)).timeit(number=1)
+        print "{0:<55} : {1}".format("random_csr_graph_uniform, parallel", time)
+        gc.collect()
+        serial = random_csr_graph_uniform(*test, seed=1, processes=1)
+        parallel = random_csr_graph_uniform(*test, seed=1)
+        same = serial.offsets() == parallel.offsets() and serial.targets() == parallel.targets()
+        print "{0:<55} : {1}".format("results match", same)
+        del serial, parallel
+        gc.collect()
+        print ""
+
+
+
+    print "\n*** Tests for 'generate_graph', generating vs loading from the cache: ***\n"
+
+    cache_dir = tempfile.mkdtemp()
+    tests = [   ('uniform', 100000, 3000000), ('rmat', 10000, 1000000), ('barabasi_albert', 10000, 100)   ]
+
+    try:
+        for test in tests:
+            print test
+            time = Timer(lambda: generate_graph(*test, seed=1, cache_dir=cache_dir).release()).timeit(number=1)
+            print "{0:<55} : {1}".format("generate_graph, first call", time)
+            gc.collect()
+            time = Timer(lambda: generate_graph(*test, seed=1, cache_dir=cache_dir).release()).timeit(number=1)
+            print "{0:<55} : {1}".format("generate_graph, cached", time)
+            gc.collect()
+            print ""
+    finally:
+        shutil.rmtree(cache_dir)
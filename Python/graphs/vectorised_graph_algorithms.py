@@ -0,0 +1,152 @@
+import numpy as np
+
+from graph_representations import CSRGraph, csrgraph_from_graph
+
+
+#
+# input:
+#  - graph:   anything with the 'Graph' interface, nodes 0..n-1
+#
+# output:
+#  - offsets: numpy view of the CSR offsets
+#  - targets: numpy view of the CSR targets
+#
+# notes:
+#  - no copying when 'graph' already is a 'CSRGraph'
+#
+def numpy_csr(graph):
+    if not isinstance(graph, CSRGraph): graph = csrgraph_from_graph(graph)
+    return _numpy_view(graph.offsets()), _numpy_view(graph.targets())
+
+
+def _numpy_view(items):
+    dtype = np.dtype(items.typecode)
+    # 'frombuffer' refuses empty buffers
+    if not len(items): return np.zeros(0, dtype=dtype)
+    return np.frombuffer(items, dtype=dtype)
+
+
+#
+# level-synchronous variant of 'bfs_sm_shortest_cormen'
+#
+# input:
+#  - graph:    directed, may be cyclic (CSR representation, or converted to it)
+#  - start:    root node to search from
+#
+# output:
+#  - parent:   parent of every node (as array, -1 for 'start' and unreached nodes)
+#  - distance: shortest distance to 'start' for every node (as array, -1 if unreached)
+#
+# notes:
+#  - performs a breath-first search, but expands the frontier (a whole level)
+#    using NumPy instead of one node at a time
+#  - the frontier is expanded in blocks of about 'no_nodes' edges: gather the edges
+#    leaving the block, drop the ones to discovered nodes, and keep the first edge
+#    to every remaining node
+#  - the next frontier is kept in order of discovery, so 'parent' is the node a
+#    FIFO queue would have picked: results equal those of 'bfs_sm_shortest_cormen'
+#  - stops as soon as every node is discovered, which on dense graphs is early in
+#    the second level, so most edges are never looked at
+#
+def bfs_sm_shortest_levelsync(graph, start):
+    offsets, targets = numpy_csr(graph)
+    no_nodes = len(offsets) - 1
+    if not 0 <= start < no_nodes: raise ValueError("Start node not in graph")
+    # set properties for start node
+    parent = np.empty(no_nodes, dtype=np.int32)
+    parent.fill(-1)
+    distance = np.empty(no_nodes, dtype=np.int32)
+    distance.fill(-1)
+    distance[start] = 0
+    # frontier nodes per block, so that a block has about 'no_nodes' edges
+    blocksize = max(1, no_nodes**2 // max(1, len(targets)))
+    # loop until the frontier is empty or every node is discovered
+    frontier = np.array([start], dtype=np.int64)
+    undiscovered = no_nodes - 1
+    level = 0
+    while frontier.size and undiscovered:
+        level += 1
+        discovered = []
+        for i in xrange(0, frontier.size, blocksize):
+            block = frontier[i:i+blocksize]
+            # all edges leaving the block, in frontier order
+            firsts = offsets[block]
+            degrees = offsets[block + 1] - firsts
+            no_edges = degrees.sum()
+            if no_edges == 0: continue
+            shift = np.repeat(firsts - (np.cumsum(degrees) - degrees), degrees)
+            adjacents = targets[np.arange(no_edges) + shift]
+            sources = np.repeat(block, degrees)
+            # skip if already discovered
+            new = distance[adjacents] < 0
+            adjacents = adjacents[new]
+            sources = sources[new]
+            # keep the first edge to every new node, in order of discovery
+            _, first = np.unique(adjacents, return_index=True)
+            first.sort()
+            adjacents = adjacents[first]
+            # record properties
+            parent[adjacents] = sources[first]
+            distance[adjacents] = level
+            discovered.append(adjacents)
+            undiscovered -= adjacents.size
+            if not undiscovered: break
+        frontier = np.concatenate(discovered).astype(np.int64) if discovered else np.zeros(0, dtype=np.int64)
+    return parent, distance
+
+
+#
+# input:
+#  - parent:   parent array as returned above
+#  - distance: distance array as returned above
+#
+# output:
+#  - parent:   parent dictionary as returned by 'bfs_sm_shortest_cormen'
+#  - distance: distance dictionary as returned by 'bfs_sm_shortest_cormen'
+#
+def dicts_from_arrays(parent, distance):
+    reached = np.flatnonzero(distance >= 0)
+    parent_dict = {}
+    distance_dict = {}
+    for (node, p, d) in zip(reached.tolist(), parent[reached].tolist(), distance[reached].tolist()):
+        parent_dict[node] = p if d > 0 else None
+        distance_dict[node] = d
+    return parent_dict, distance_dict
+
+
+
+
+
+# ********
+#
+# performance tests
+#
+# ********
+
+if __name__ == '__main__':
+
+    from random_graph_generation import random_dictlist_graph_sample_split_set_optimised as random_dictlist_graph
+    from graph_representations import csrgraph_from_dictlist
+    from elementary_graph_algorithms import Graph, bfs_sm_shortest_cormen
+
+    from timeit import Timer
+    import gc
+
+    print "\n*** Tests for 'sm' BFS methods, queue vs level-synchronous: ***\n"
+
+    tests = [   (200,3000), (2000,30000), (2000,1000000), (2000,3000000), (20000,3500000)  ]
+
+    for test in tests:
+        print test
+        dictlist = random_dictlist_graph(*test)
+        dictgraph = Graph(dictlist)
+        csrgraph = csrgraph_from_dictlist(dictlist)
+        matches = bfs_sm_shortest_cormen(dictgraph, 0) == dicts_from_arrays(*bfs_sm_shortest_levelsync(csrgraph, 0))
+        time = Timer(lambda: bfs_sm_shortest_cormen(dictgraph, 0)).timeit(number=3)
+        print "{0:<55} : {1}".format("bfs_sm_shortest_cormen", time)
+        gc.collect()
+        time = Timer(lambda: bfs_sm_shortest_levelsync(csrgraph, 0)).timeit(number=3)
+        print "{0:<55} : {1}".format("bfs_sm_shortest_levelsync", time)
+        print "{0:<55} : {1}".format("results match", matches)
+        gc.collect()
+        print ""
@@ -0,0 +1,138 @@
+from array import array
+
+import numpy as np
+
+from graph_representations import CSRGraph
+
+
+# ********
+#
+# methods from generating directed, unconnected, cyclic (single) graph
+#  - nodes as the integers 0..n-1
+#  - edges in CSR representation, adjacent nodes sorted
+#
+# ********
+
+#
+# input:
+#  - no_values: size of the range to sample from
+#  - no_samples: number of distinct values to sample
+#
+# output:
+#  - values:    'no_samples' distinct values from 0..no_values-1, sorted (as numpy array)
+#
+# notes:
+#  - draws with replacement and drops duplicates, drawing again for the ones that
+#    went missing; which values survive does not depend on their order, so every
+#    subset is equally likely
+#  - O(no_samples) memory, unlike 'random.sample' on an index array
+#
+def _sample_sorted(no_values, no_samples):
+    values = np.zeros(0, dtype=np.int64)
+    while len(values) < no_samples:
+        missing = no_samples - len(values)
+        # expected number of draws to get 'missing' new values, plus some slack
+        draws = int(missing * float(no_values) / (no_values - len(values)) * 1.1) + 16
+        values = np.union1d(values, np.random.randint(0, no_values, size=draws).astype(np.int64))
+    if len(values) > no_samples:
+        values = np.sort(np.random.permutation(values)[:no_samples])
+    return values
+
+
+#
+# input:
+#  - no_nodes: number of nodes n
+#  - edges:    edges encoded as node_from*n + node_to, sorted (as numpy array)
+#
+# output:
+#  - graph:    the graph in CSR representation
+#
+def csrgraph_from_edge_ids(no_nodes, edges):
+    targets = (edges % no_nodes).astype(np.dtype('i'))
+    degrees = np.bincount(edges // no_nodes, minlength=no_nodes)
+    offsets = np.zeros(no_nodes + 1, dtype=np.dtype('l'))
+    np.cumsum(degrees, out=offsets[1:])
+    return CSRGraph(_array_from_numpy('l', offsets), _array_from_numpy('i', targets))
+
+
+def _array_from_numpy(typecode, values):
+    items = array(typecode)
+    items.fromstring(values.astype(np.dtype(typecode)).tostring())
+    return items
+
+
+#
+# as 'random_dictlist_graph_sample' but sampling and decoding all edges at once
+#
+def random_csr_graph_sample(no_nodes, no_edges):
+    max_no_edges = no_nodes**2
+    no_edges = min(no_edges, max_no_edges)
+    existing_edges = _sample_sorted(max_no_edges, no_edges)
+    return csrgraph_from_edge_ids(no_nodes, existing_edges)
+
+
+#
+# as 'random_dictlist_graph_sample_split_sorted' but sampling and decoding all
+# edges at once
+#  - for dense graphs sample the missing edges instead, and keep the rest by masking
+#
+def random_csr_graph_sample_split(no_nodes, no_edges, weight=0.6):
+    max_no_edges = no_nodes**2
+    no_edges = min(no_edges, max_no_edges)
+    if no_edges < max_no_edges*weight:
+        existing_edges = _sample_sorted(max_no_edges, no_edges)
+    else:
+        missing_edges = _sample_sorted(max_no_edges, max_no_edges - no_edges)
+        existing = np.ones(max_no_edges, dtype=np.bool_)
+        existing[missing_edges] = False
+        existing_edges = np.flatnonzero(existing)
+    return csrgraph_from_edge_ids(no_nodes, existing_edges)
+
+
+
+
+
+# ********
+#
+# performance tests
+#
+# ********
+
+if __name__ == '__main__':
+
+    from random_graph_generation import random_dictlist_graph_sample_split_set_optimised, random_dictlist_graph_sample_split_sorted_alt
+
+    from timeit import Timer
+    import gc
+
+    print "\n*** Tests for 'random_dictlist' vs 'random_csr' methods: ***\n"
+
+    tests = [   (200,3000), (2000,30000), (2000,1000000), (2000,3000000)    ]
+    algos = [   "random_dictlist_graph_sample_split_set_optimised",
+                "random_dictlist_graph_sample_split_sorted_alt",
+                "random_csr_graph_sample",
+                "random_csr_graph_sample_split"     ]
+
+    for test in tests:
+        print test
+        for algo in algos:
+            algocode = locals()[algo]
+            time = Timer(lambda: algocode(*test)).timeit(number=3)
+            print "{0:<55} : {1}".format(algo, time)
+            gc.collect()
+        print ""
+
+    print "\n*** Tests for 'random_csr' methods, large graphs: ***\n"
+
+    tests = [   (100000,10000000), (1000000,30000000), (5000,20000000)   ]
+    algos = [   "random_csr_graph_sample",
+                "random_csr_graph_sample_split"     ]
+
+    for test in tests:
+        print test
+        for algo in algos:
+            algocode = locals()[algo]
+            time = Timer(lambda: algocode(*test)).timeit(number=1)
+            print "{0:<55} : {1}".format(algo, time)
+            gc.collect()
+        print ""
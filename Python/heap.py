@@ -1,3 +1,6 @@
+from collections import deque
+
+
 
 
 
@@ -25,9 +28,11 @@
 
 class Heap:
     
-    def __init__(self, heap=[]):
+    # heapsize: number of items at the front of 'heap' in the heap (all if not given),
+    #           the rest being room for 'insert'
+    def __init__(self, heap=[], heapsize=None):
         self._heap = heap
-        self._heapsize = len(heap)
+        self._heapsize = len(heap) if heapsize is None else heapsize
         
     def value(self, i):
         return _heap[i]
@@ -118,8 +123,8 @@ class MaxHeap(Heap):
 
 class MinHeap(Heap):
     
-    def __init__(self, heap=[]):
-        Heap.__init__(self, heap)
+    def __init__(self, heap=[], heapsize=None):
+        Heap.__init__(self, heap, heapsize)
     
     # turns heap at i into min-heap
     #  - assuming heaps at left(i) and right(i) are min-heaps
@@ -241,8 +246,8 @@ class MaxPriorityQueue(MaxHeap):
 
 class MinPriorityQueue(MinHeap):
     
-    def __init__(self, heap=[]):
-        MinHeap.__init__(self, heap)
+    def __init__(self, heap=[], heapsize=None):
+        MinHeap.__init__(self, heap, heapsize)
         
     def minimum(self):
         return self._heap[0]
@@ -301,15 +306,386 @@ class MinPriorityQueue(MinHeap):
         
         
 
+
+
+
+
+
+
+
+# min-priority queue of items, each with a key, where an item is found by the item
+# itself (its handle) rather than by its index in the array
+#  - 'position' maps every item to its index, and is kept up to date as items move,
+#    so 'decrease_key' needs no search
+#  - items must be hashable; keys are compared, items never are
+#  - grows as needed, unlike 'MinPriorityQueue'
+
+class IndexedMinPriorityQueue(Heap):
+
+    def __init__(self):
+        Heap.__init__(self, [])
+        self._items = []
+        self._position = dict()
+
+    def size(self):
+        return self._heapsize
+
+    def contains(self, item):
+        return item in self._position
+
+    def key(self, item):
+        return self._heap[self._position[item]]
+
+    # (item, key) with the smallest key
+    def minimum(self):
+        return (self._items[0], self._heap[0])
+
+    def extract_min(self):
+        if self._heapsize < 1: return None
+        minimum = (self._items[0], self._heap[0])
+        del self._position[self._items[0]]
+        # remove current min and replace with the last item
+        key = self._heap.pop()
+        item = self._items.pop()
+        self._heapsize -= 1
+        # find next minimum element
+        if self._heapsize > 0: self._move_down(0, item, key)
+        return minimum
+
+    def decrease_key(self, item, key):
+        i = self._position[item]
+        if key > self._heap[i]: raise ValueError("New key is larger than current key")
+        self._move_up(i, item, key)
+
+    def insert(self, item, key):
+        if item in self._position: raise ValueError("Item is already in the queue")
+        self._heap.append(key)
+        self._items.append(item)
+        self._heapsize += 1
+        self._move_up(self._heapsize - 1, item, key)
+
+    # places 'item' at index i or above
+    #  - traverse towards the top for the right location, moving parents down on the way
+    def _move_up(self, i, item, key):
+        heap, items, position = self._heap, self._items, self._position
+        while i > 0:
+            parent = (i-1) // 2
+            if not heap[parent] > key: break
+            heap[i] = heap[parent]
+            items[i] = items[parent]
+            position[items[i]] = i
+            i = parent
+        # update value at the index we found
+        heap[i] = key
+        items[i] = item
+        position[item] = i
+
+    # places 'item' at index i or below
+    #  - as 'min_heapify', but moving the smaller child up instead of swapping
+    def _move_down(self, i, item, key):
+        heap, items, position = self._heap, self._items, self._position
+        heapsize = self._heapsize
+        while True:
+            child = 2*i + 1
+            if not child < heapsize: break
+            if child + 1 < heapsize and heap[child + 1] < heap[child]: child += 1
+            if not heap[child] < key: break
+            heap[i] = heap[child]
+            items[i] = items[child]
+            position[items[i]] = i
+            i = child
+        # update value at the index we found
+        heap[i] = key
+        items[i] = item
+        position[item] = i
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+######################
+#
+#  Dijkstra (Cormen et al. section 24.3)
+#
+#  - single-source shortest paths in a graph with non-negative edge weights, on
+#    anything with 'weighted_neighbours' giving (adjacent node, weight) pairs (see
+#    'WeightedGraph' in graphs/elementary_graph_algorithms.py)
+#  - with decrease-key by node on 'IndexedMinPriorityQueue', so every node is in
+#    the queue at most once
+#  - or with lazy deletion on 'MinPriorityQueue': a shorter distance is inserted as
+#    a new entry and the old one skipped when it comes out, so the queue holds up
+#    to one entry per edge but needs no index
+#
+
+#
+# input:
+#  - graph:    directed, may be cyclic, non-negative weights (weighted dict+list representation)
+#  - start:    root node to search from
+#
+# output:
+#  - parent:   parent relationship to 'start' for all nodes reachable from 'start'
+#  - distance: shortest distance to 'start' for all nodes reachable from 'start'
+#
+# notes:
+#  - nodes are only inserted once reached, so unreachable nodes cost nothing
+#  - O((V+E) lg V)
+#
+def dijkstra_sm_shortest(graph, start):
+    parent = { start: None }
+    distance = { start: 0 }
+    done = set()
+    queue = IndexedMinPriorityQueue()
+    queue.insert(start, 0)
+    while queue.size() > 0:
+        (node, node_distance) = queue.extract_min()
+        done.add(node)
+        for (adjacent, weight) in graph.weighted_neighbours(node):
+            if weight < 0: raise ValueError("Negative edge weight")
+            if adjacent in done: continue
+            adjacent_distance = node_distance + weight
+            if not adjacent in distance:
+                queue.insert(adjacent, adjacent_distance)
+            elif adjacent_distance < distance[adjacent]:
+                queue.decrease_key(adjacent, adjacent_distance)
+            else:
+                continue
+            distance[adjacent] = adjacent_distance
+            parent[adjacent] = node
+    return parent, distance
+
+
+#
+# point-to-point version of the above
+#
+# input:
+#  - graph:    directed, may be cyclic, non-negative weights (weighted dict+list representation)
+#  - start:    root node to search from
+#  - end:      target node to search for
+#
+# output:
+#  - path:     shortest path from 'start' to 'end' (as list), or None if there is none
+#  - distance: its length, or None if there is no path
+#
+# notes:
+#  - stops as soon as 'end' leaves the queue, since its distance is then final
+#
+def dijkstra_ss_shortest(graph, start, end):
+    parent = { start: None }
+    distance = { start: 0 }
+    done = set()
+    queue = IndexedMinPriorityQueue()
+    queue.insert(start, 0)
+    while queue.size() > 0:
+        (node, node_distance) = queue.extract_min()
+        if node == end: break
+        done.add(node)
+        for (adjacent, weight) in graph.weighted_neighbours(node):
+            if weight < 0: raise ValueError("Negative edge weight")
+            if adjacent in done: continue
+            adjacent_distance = node_distance + weight
+            if not adjacent in distance:
+                queue.insert(adjacent, adjacent_distance)
+            elif adjacent_distance < distance[adjacent]:
+                queue.decrease_key(adjacent, adjacent_distance)
+            else:
+                continue
+            distance[adjacent] = adjacent_distance
+            parent[adjacent] = node
+    else:
+        return None, None
+    # traverse parent map to get path
+    path = [end]
+    while parent[path[-1]] is not None:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return path, distance[end]
+
+
+#
+# lazy-deletion version of 'dijkstra_sm_shortest'
+#
+# notes:
+#  - the queue holds (distance, node) pairs, and gets room for one per edge up front
+#  - a pair whose node is already done is stale, and dropped as it comes out
+#  - O((V+E) lg E), which is O((V+E) lg V) again since E <= V**2
+#
+def dijkstra_sm_shortest_lazy(graph, start):
+    parent = { start: None }
+    distance = { start: 0 }
+    done = set()
+    room = 1 + sum(len(graph.neighbours(node)) for node in graph.nodes())
+    queue = MinPriorityQueue([None] * room, heapsize=0)
+    queue.insert((0, start))
+    while True:
+        entry = queue.extract_min()
+        if entry is None: break
+        (node_distance, node) = entry
+        if node in done: continue
+        done.add(node)
+        for (adjacent, weight) in graph.weighted_neighbours(node):
+            if weight < 0: raise ValueError("Negative edge weight")
+            if adjacent in done: continue
+            adjacent_distance = node_distance + weight
+            if adjacent in distance and not adjacent_distance < distance[adjacent]: continue
+            distance[adjacent] = adjacent_distance
+            parent[adjacent] = node
+            queue.insert((adjacent_distance, adjacent))
+    return parent, distance
+
+
+
+
+
+
+
+
+
+
+
 ######################
 #
-#  Dijkstra (Cormen et al. section ...)
+#  Integer weights
 #
+#  - when the weights are small non-negative integers, the queue need not compare
+#    keys: a distance is a bucket index
+#  - both below return the same distances as 'dijkstra_sm_shortest'
+#  - buckets are emptied first in, first out, so when all weights are 1 both also
+#    return the same parents as 'bfs_sm_shortest_cormen', visiting the nodes in
+#    the order of its rim
+#  - both skip stale entries as in 'dijkstra_sm_shortest_lazy', so entries are only
+#    ever appended to a bucket and never moved to a shorter one
 #
 
+# largest edge weight in the graph, checking that all are non-negative integers
+def max_edge_weight(graph):
+    largest = 0
+    for node in graph.nodes():
+        for (adjacent, weight) in graph.weighted_neighbours(node):
+            if weight < 0 or not isinstance(weight, (int, long)): raise ValueError("Edge weight is not a non-negative integer")
+            if weight > largest: largest = weight
+    return largest
 
 
+#
+# from Dial, "Algorithm 360: Shortest-path forest with topological ordering"
+#
+# input:
+#  - graph:      directed, may be cyclic, non-negative integer weights (weighted
+#                dict+list representation)
+#  - start:      root node to search from
+#  - max_weight: largest edge weight in the graph (found with 'max_edge_weight' if
+#                not given)
+#
+# output:
+#  - parent:     parent relationship to 'start' for all nodes reachable from 'start'
+#  - distance:   shortest distance to 'start' for all nodes reachable from 'start'
+#
+# notes:
+#  - a bucket for every distance, emptied in increasing order; since no node is
+#    ever more than 'max_weight' ahead of the bucket being emptied, max_weight + 1
+#    buckets used cyclically are enough
+#  - O(E + V*C) for C = max_weight, since empty buckets are passed over too: good
+#    for small C, and the gaps are what make it slow for large C
+#
+def dijkstra_sm_shortest_dial(graph, start, max_weight=None):
+    if max_weight is None: max_weight = max_edge_weight(graph)
+    no_buckets = max_weight + 1
+    buckets = [ deque() for i in xrange(no_buckets) ]
+    parent = { start: None }
+    distance = { start: 0 }
+    buckets[0].append(start)
+    pending = 1     # entries in the buckets, stale ones included
+    current = 0
+    while pending:
+        bucket = buckets[current % no_buckets]
+        # zero weights add to the bucket being emptied, so pop until it is empty
+        while bucket:
+            node = bucket.popleft()
+            pending -= 1
+            # stale: the node was added again with a shorter distance
+            if distance[node] != current: continue
+            for (adjacent, weight) in graph.weighted_neighbours(node):
+                if weight < 0: raise ValueError("Negative edge weight")
+                adjacent_distance = current + weight
+                if adjacent in distance and not adjacent_distance < distance[adjacent]: continue
+                distance[adjacent] = adjacent_distance
+                parent[adjacent] = node
+                buckets[adjacent_distance % no_buckets].append(adjacent)
+                pending += 1
+        current += 1
+    return parent, distance
+
 
+#
+# from Ahuja, Mehlhorn, Orlin, and Tarjan, "Faster algorithms for the shortest
+# path problem"
+#
+# input:
+#  - graph:      directed, may be cyclic, non-negative integer weights (weighted
+#                dict+list representation)
+#  - start:      root node to search from
+#  - max_weight: largest edge weight in the graph (found with 'max_edge_weight' if
+#                not given)
+#
+# output:
+#  - parent:     parent relationship to 'start' for all nodes reachable from 'start'
+#  - distance:   shortest distance to 'start' for all nodes reachable from 'start'
+#
+# notes:
+#  - radix heap: a (distance, node) entry goes in bucket i when its distance first
+#    differs from the last distance taken out at bit i-1 (bucket 0 if equal), so
+#    bucket i holds distances less than 2**i ahead of it
+#  - when bucket 0 is empty, the first non-empty bucket is spread over the lower
+#    ones relative to its smallest distance, which then becomes the last distance;
+#    every entry only moves down, so at most lg(V*C) times
+#  - O(E + V lg(V*C)) for C = max_weight, so unlike Dial large weights cost little
+#
+def dijkstra_sm_shortest_radix(graph, start, max_weight=None):
+    if max_weight is None: max_weight = max_edge_weight(graph)
+    # distances are at most max_weight * (V-1), so their bits fit this many buckets
+    no_buckets = (max_weight * len(graph.nodes())).bit_length() + 1
+    buckets = [ deque() for i in xrange(no_buckets) ]
+    parent = { start: None }
+    distance = { start: 0 }
+    buckets[0].append((0, start))
+    pending = 1     # entries in the buckets, stale ones included
+    last = 0
+    while pending:
+        if not buckets[0]:
+            # find the first non-empty bucket, and spread it over the lower ones
+            i = 1
+            while not buckets[i]: i += 1
+            entries = buckets[i]
+            buckets[i] = deque()
+            last = min(entries)[0]
+            for entry in entries:
+                buckets[(entry[0] ^ last).bit_length()].append(entry)
+        (node_distance, node) = buckets[0].popleft()
+        pending -= 1
+        # stale: the node was added again with a shorter distance
+        if distance[node] != node_distance: continue
+        for (adjacent, weight) in graph.weighted_neighbours(node):
+            if weight < 0: raise ValueError("Negative edge weight")
+            adjacent_distance = node_distance + weight
+            if adjacent in distance and not adjacent_distance < distance[adjacent]: continue
+            distance[adjacent] = adjacent_distance
+            parent[adjacent] = node
+            buckets[(adjacent_distance ^ last).bit_length()].append((adjacent_distance, adjacent))
+            pending += 1
+    return parent, distance
 
 
 
@@ -320,4 +696,71 @@ class MinPriorityQueue(MinHeap):
 
 
 
+######################
+#
+#  performance tests
+#
+#
 
+if __name__ == '__main__':
+
+    import os
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'graphs'))
+
+    from random_graph_generation import random_dictlist_graph_sample_split_set_optimised, random_weights
+    from random_graph_generation import random_weighted_graph_sample, random_weighted_graph_rmat, random_weighted_graph_barabasi_albert
+    from elementary_graph_algorithms import WeightedGraph, bfs_sm_shortest_cormen
+
+    from timeit import Timer
+    import gc
+
+    print "\n*** Tests for Dijkstra, decrease-key vs lazy deletion: ***\n"
+
+    tests = [   ("random_weighted_graph_sample", (2000,30000)),
+                ("random_weighted_graph_sample", (2000,1000000)),
+                ("random_weighted_graph_sample", (100000,1000000)),
+                ("random_weighted_graph_rmat", (100000,1000000)),
+                ("random_weighted_graph_barabasi_albert", (100000,10))  ]
+    algos = [   "dijkstra_sm_shortest",
+                "dijkstra_sm_shortest_lazy"     ]
+
+    for (generator, test) in tests:
+        print generator, test
+        generatorcode = locals()[generator]
+        graph = WeightedGraph(generatorcode(*test, seed=1))
+        for algo in algos:
+            algocode = locals()[algo]
+            time = Timer(lambda: algocode(graph, 0)).timeit(number=3)
+            print "{0:<55} : {1}".format(algo, time)
+            gc.collect()
+        time = Timer(lambda: dijkstra_ss_shortest(graph, 0, test[0] - 1)).timeit(number=3)
+        print "{0:<55} : {1}".format("dijkstra_ss_shortest", time)
+        gc.collect()
+        print ""
+
+
+
+    print "\n*** Tests for integer weights, heap vs buckets: ***\n"
+
+    tests = [   (10000,100000), (100000,1000000)    ]
+    weights = [ 1, 10, 1000, 100000 ]
+    algos = [   "dijkstra_sm_shortest",
+                "dijkstra_sm_shortest_dial",
+                "dijkstra_sm_shortest_radix"    ]
+
+    for test in tests:
+        dictlist = random_dictlist_graph_sample_split_set_optimised(*test)
+        for max_weight in weights:
+            print test, max_weight
+            graph = WeightedGraph(random_weights(dictlist, max_weight, seed=1))
+            if max_weight == 1:
+                time = Timer(lambda: bfs_sm_shortest_cormen(graph, 0)).timeit(number=3)
+                print "{0:<55} : {1}".format("bfs_sm_shortest_cormen", time)
+                gc.collect()
+            for algo in algos:
+                algocode = locals()[algo]
+                time = Timer(lambda: algocode(graph, 0)).timeit(number=3)
+                print "{0:<55} : {1}".format(algo, time)
+                gc.collect()
+            print ""